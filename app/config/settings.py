@@ -24,6 +24,7 @@ class Settings(BaseSettings):
     learned_products_csv: str = Field("data/learned_products.csv", alias="LEARNED_PRODUCTS_CSV")
     learned_suppliers_csv: str = Field("data/learned_suppliers.csv", alias="LEARNED_SUPPLIERS_CSV")
     fuzzy_threshold: float = Field(0.85, alias="FUZZY_THRESHOLD")
+    max_concurrent_ocr: int = Field(5, alias="MAX_CONCURRENT_OCR")
 
     model_config = {
         "env_file": ".env",
@@ -41,6 +41,7 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 # Настройки кэширования
 CACHE_TTL = 3600  # 1 час
+CACHE_MAX_SIZE = 10_000  # записей в in-memory кэше
 CACHE_PREFIX = "nota:"
 
 # Настройки поиска
@@ -56,7 +57,7 @@ MAX_USERNAME_LENGTH = 32
 # Настройки файлов
 UPLOAD_DIR = "uploads"
 MAX_UPLOAD_SIZE = 10 * 1024 * 1024  # 10 MB
-ALLOWED_EXTENSIONS = {".pdf", ".jpg", ".jpeg", ".png"}
+ALLOWED_EXTENSIONS = frozenset({".pdf", ".jpg", ".jpeg", ".png"})
 
 # Настройки уведомлений
 NOTIFICATION_TYPES = {
@@ -69,4 +70,11 @@ NOTIFICATION_TYPES = {
     "supplier_created": "Создан новый поставщик",
     "supplier_updated": "Поставщик обновлен",
     "supplier_deleted": "Поставщик удален",
-} 
\ No newline at end of file
+} 
+# Иконки кнопок редактора по типу проблемы (коды из analyze_invoice_issues)
+ISSUE_ICONS = {
+    "product_not_found": "⚠",
+    "product_low_confidence": "❔",
+    "unit_mismatch": "🔄",
+    "unit_missing_in_product": "🔄",
+}
@@ -45,7 +45,7 @@ class CSVStorage:
         """Загружает список продуктов."""
         async with aiofiles.open(self.products_file, mode="r") as f:
             content = await f.read()
-            logger.debug("products_file_content", content=content)
+            logger.debug("products_file_read", size=len(content))
             reader = csv.DictReader(content.splitlines())
             products = list(reader)
             # Преобразуем строки JSON в списки
@@ -64,7 +64,7 @@ class CSVStorage:
         """Загружает список поставщиков."""
         async with aiofiles.open(self.suppliers_file, mode="r") as f:
             content = await f.read()
-            logger.debug("suppliers_file_content", content=content)
+            logger.debug("suppliers_file_read", size=len(content))
             reader = csv.DictReader(content.splitlines())
             suppliers = list(reader)
             # Преобразуем строки JSON в списки
@@ -8,15 +8,15 @@ from __future__ import annotations
 
 import structlog
 from pathlib import Path
-from typing import Optional, Dict, Any, Tuple, List
+from typing import Optional, Dict, Any, Tuple, List, NamedTuple, Iterable
 from functools import lru_cache
-import json
 
 import pandas as pd
-from rapidfuzz import fuzz
+from rapidfuzz import fuzz, process
 
 from app.config.storage import get_data_dir
 from app.core.csv_storage import CSVStorage
+from app.utils.unit_converter import normalize_unit
 
 logger = structlog.get_logger()
 
@@ -36,6 +36,29 @@ SUPPLIERS_LIST: List[Dict[str, Any]] = []
 # Инициализация хранилища
 storage = CSVStorage(get_data_dir())
 
+
+def normalize_product_name(name: str) -> str:
+    """
+    Приводит название товара к виду для сравнения: нижний регистр,
+    без пробелов по краям и с одиночными пробелами между словами.
+    
+    Args:
+        name: Название товара
+        
+    Returns:
+        str: Нормализованное название
+    """
+    return " ".join(name.lower().split())
+
+
+class ProductCatalog(NamedTuple):
+    """Справочник товаров, подготовленный для нечеткого поиска."""
+    ids: List[Any]
+    names: List[str]
+    names_lower: List[str]
+    units: List[Optional[str]]
+    exact_index: Dict[str, int]  # нормализованное название -> позиция в списках
+
 def load_data() -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Загружает данные из CSV файлов в память.
@@ -69,17 +92,48 @@ def load_data() -> Tuple[pd.DataFrame, pd.DataFrame]:
         if missing_product_cols:
             raise ValueError(f"Отсутствуют колонки в products.csv: {missing_product_cols}")
         
+        # Нормализуем единицы измерения товаров один раз при загрузке
+        PRODUCTS["norm_unit"] = PRODUCTS["measureName"].map(normalize_unit, na_action="ignore")
+        
         logger.info(
             "Данные загружены: %d поставщиков, %d товаров", 
             len(SUPPLIERS), len(PRODUCTS)
         )
         
+        # Справочник перезагружен — сбрасываем подготовленный каталог
+        get_product_catalog.cache_clear()
+        
         return SUPPLIERS, PRODUCTS
         
     except Exception as e:
         logger.error("Ошибка при загрузке данных: %s", str(e))
         raise
 
+@lru_cache(maxsize=1)
+def get_product_catalog() -> ProductCatalog:
+    """
+    Возвращает каталог товаров, подготовленный один раз после загрузки CSV.
+    
+    Кеш сбрасывается в load_data(), поэтому каталог всегда соответствует
+    текущему содержимому PRODUCTS.
+    
+    Returns:
+        ProductCatalog: Идентификаторы, названия и единицы измерения товаров
+    """
+    if PRODUCTS is None:
+        load_data()
+    
+    ids = PRODUCTS["id"].tolist()
+    names = [str(name) for name in PRODUCTS["name"].tolist()]
+    names_lower = [normalize_product_name(name) for name in names]
+    units = [None if pd.isna(unit) else unit for unit in PRODUCTS["measureName"].tolist()]
+    
+    exact_index: Dict[str, int] = {}
+    for idx, name in enumerate(names_lower):
+        exact_index.setdefault(name, idx)
+    
+    return ProductCatalog(ids, names, names_lower, units, exact_index)
+
 def get_supplier(name: str) -> Optional[Dict[str, Any]]:
     """
     Находит поставщика по имени.
@@ -122,25 +176,24 @@ def get_product_alias(alias: str) -> Optional[Dict[str, Any]]:
     Returns:
         Dict[str, Any]: Данные товара или None
     """
-    global PRODUCTS
-    if PRODUCTS is None:
-        load_data()
+    # Каталог хранит нормализованные названия, подготовленные при загрузке
+    catalog = get_product_catalog()
+    alias_lower = normalize_product_name(alias)
         
     # Ищем точное совпадение
-    mask = PRODUCTS["name"].str.lower() == alias.lower()
-    matches = PRODUCTS[mask]
-    
-    if not matches.empty:
-        return matches.iloc[0].to_dict()
+    idx = catalog.exact_index.get(alias_lower)
+    if idx is not None:
+        return PRODUCTS.iloc[idx].to_dict()
         
     # Если точного совпадения нет, ищем по частичному
-    ratios = PRODUCTS["name"].apply(
-        lambda x: fuzz.token_set_ratio(x.lower(), alias.lower())
+    match = process.extractOne(
+        alias_lower,
+        catalog.names_lower,
+        scorer=fuzz.token_set_ratio,
+        score_cutoff=80  # Порог схожести
     )
-    best_match_idx = ratios.argmax()
-    
-    if ratios[best_match_idx] >= 80:  # Порог схожести
-        return PRODUCTS.iloc[best_match_idx].to_dict()
+    if match:
+        return PRODUCTS.iloc[match[2]].to_dict()
         
     return None
 
@@ -154,22 +207,39 @@ def get_product_details(product_id: int) -> Optional[Dict[str, Any]]:
     Returns:
         Dict[str, Any]: Данные продукта или None
     """
+    # Одиночный запрос — частный случай пакетной выборки
+    if not product_id:
+        return None
+    return get_products_details([product_id]).get(product_id)
+
+def get_products_details(product_ids: Iterable[Any]) -> Dict[Any, Dict[str, Any]]:
+    """
+    Получает детали сразу нескольких продуктов одной выборкой.
+    
+    Args:
+        product_ids: ID продуктов
+        
+    Returns:
+        Dict[Any, Dict[str, Any]]: Данные продуктов по их ID (ненайденные отсутствуют)
+    """
     global PRODUCTS
     if PRODUCTS is None:
         load_data()
     
-    if not product_id:
-        return None
-    
-    mask = PRODUCTS["id"] == product_id
-    matches = PRODUCTS[mask]
+    ids = {pid for pid in product_ids if pid}
+    if not ids:
+        return {}
     
-    if matches.empty:
-        return None
+    matches = PRODUCTS[PRODUCTS["id"].isin(ids)]
     
-    # Получаем данные и заменяем NaN на None
-    product_dict = matches.iloc[0].to_dict()
-    return {k: None if pd.isna(v) else v for k, v in product_dict.items()}
+    details: Dict[Any, Dict[str, Any]] = {}
+    for product_dict in matches.to_dict("records"):
+        # Берем первое совпадение по ID, NaN заменяем на None
+        details.setdefault(
+            product_dict["id"],
+            {k: None if pd.isna(v) else v for k, v in product_dict.items()}
+        )
+    return details
 
 async def load_data_async() -> None:
     """Загружает данные из CSV файлов."""
@@ -205,10 +275,6 @@ def get_product_alias_async(name: str) -> Optional[str]:
     logger.debug("searching_product", name=name, products_count=len(PRODUCTS_LIST))
     
     for product in PRODUCTS_LIST:
-        logger.debug("checking_product", 
-                    product_name=product["name"],
-                    product_aliases=product["aliases"])
-        
         if name == product["name"].lower():
             logger.debug("found_exact_match", name=name)
             return product["name"]
@@ -237,10 +303,6 @@ def get_supplier_async(name: str) -> Optional[str]:
     logger.debug("searching_supplier", name=name, suppliers_count=len(SUPPLIERS_LIST))
     
     for supplier in SUPPLIERS_LIST:
-        logger.debug("checking_supplier", 
-                    supplier_name=supplier["name"],
-                    supplier_aliases=supplier["aliases"])
-        
         if name == supplier["name"].lower():
             logger.debug("found_exact_match", name=name)
             return supplier["name"]
@@ -17,6 +17,7 @@ from app.config.settings import settings
 # Import all necessary routers
 from app.routers import telegram_bot
 from app.routers.issue_editor import router as editor_router
+from app.routers.gpt_combined import close_http_client
 
 # Configure structured logging
 structlog.configure(
@@ -57,7 +58,11 @@ async def main():
     
     # Start the bot
     logger.info("Bot started")
-    await dp.start_polling(bot)
+    try:
+        await dp.start_polling(bot)
+    finally:
+        # Close the shared pooled HTTP client used for OCR requests
+        await close_http_client()
 
 
 if __name__ == "__main__":
@@ -6,12 +6,19 @@
 
 from __future__ import annotations
 
+import asyncio
 import structlog
+from collections import OrderedDict
 from typing import List, Tuple, Dict, Any, Optional
 
 from rapidfuzz import fuzz, process
 
-from app.core.data_loader import get_product_alias, PRODUCTS
+from app.core.data_loader import (
+    ProductCatalog,
+    get_product_alias,
+    get_product_catalog,
+    normalize_product_name
+)
 
 logger = structlog.get_logger()
 
@@ -21,6 +28,28 @@ DEFAULT_THRESHOLD = 0.7
 # Максимальное количество возвращаемых похожих товаров
 MAX_SIMILAR_PRODUCTS = 3
 
+# Порог token_set_ratio, при котором совпадение считается алиасом (как в get_product_alias)
+ALIAS_MATCH_THRESHOLD = 80
+
+# Максимальное количество результатов сопоставления в кеше
+MATCH_CACHE_SIZE = 4096
+
+# Кеш результатов пакетного сопоставления: (название, порог) -> (id товара, схожесть).
+# Действителен только для каталога, с которым был заполнен
+_MATCH_CACHE: "OrderedDict[Tuple[str, float], Tuple[Optional[int], float]]" = OrderedDict()
+_MATCH_CACHE_CATALOG: Optional[ProductCatalog] = None
+
+
+def _get_match_cache(
+    catalog: ProductCatalog
+) -> "OrderedDict[Tuple[str, float], Tuple[Optional[int], float]]":
+    """Возвращает кеш сопоставлений, сбрасывая его после перезагрузки каталога."""
+    global _MATCH_CACHE_CATALOG
+    if catalog is not _MATCH_CACHE_CATALOG:
+        _MATCH_CACHE.clear()
+        _MATCH_CACHE_CATALOG = catalog
+    return _MATCH_CACHE
+
 
 async def fuzzy_match_product(
     name: str, 
@@ -42,38 +71,37 @@ async def fuzzy_match_product(
     if threshold is None:
         threshold = DEFAULT_THRESHOLD
     
-    # Сначала пытаемся найти точное совпадение
+    catalog = get_product_catalog()
+    
+    # Быстрый путь: точное совпадение названия без учета регистра
+    idx = catalog.exact_index.get(normalize_product_name(name))
+    if idx is not None:
+        logger.info("Product found by exact match", 
+                   name=name, product_id=catalog.ids[idx])
+        return catalog.ids[idx], 1.0
+    
+    # Затем ищем совпадение по алиасу
     product = get_product_alias(name)
     if product:
-        logger.info("Product found by exact match", 
+        logger.info("Product found by alias match", 
                    name=name, product_id=product["id"])
         return product["id"], 1.0
     
-    # Если точного совпадения нет, используем нечеткий поиск
+    # Если совпадений нет, используем нечеткий поиск
     try:
-        # Создаем словарь для поиска
-        choices = {str(p["id"]): p["name"] for p in PRODUCTS.to_dict("records")}
-        
-        # Выполняем нечеткий поиск
-        matches = process.extract(
+        # Нужен только лучший кандидат: extractOne не сортирует все варианты
+        # и сам прекращает поиск при идеальном совпадении
+        match = process.extractOne(
             name, 
-            choices=choices.values(),
-            scorer=fuzz.token_sort_ratio, 
-            limit=MAX_SIMILAR_PRODUCTS
+            catalog.names,
+            scorer=fuzz.token_sort_ratio
         )
         
-        if not matches:
-            return None, 0.0
-            
-        # В зависимости от версии RapidFuzz, формат возвращаемых данных может отличаться
-        if len(matches[0]) == 3:  # формат (match, score, index)
-            best_match, best_score, _ = matches[0]
-        elif len(matches[0]) == 2:  # формат (match, score)
-            best_match, best_score = matches[0]
-        else:
-            logger.error("Unexpected format from rapidfuzz", match_format=matches[0])
+        if not match:
             return None, 0.0
         
+        best_match, best_score, best_idx = match
+        
         normalized_score = best_score / 100.0  # Нормализуем до диапазона 0-1
         
         if normalized_score < threshold:
@@ -81,12 +109,7 @@ async def fuzzy_match_product(
                         name=name, best_match=best_match, score=normalized_score)
             return None, normalized_score
         
-        # Находим ID товара по его имени
-        product_id = None
-        for pid, pname in choices.items():
-            if pname == best_match:
-                product_id = int(pid)
-                break
+        product_id = catalog.ids[best_idx]
         
         logger.info("Fuzzy matching product found", 
                    name=name, 
@@ -101,6 +124,142 @@ async def fuzzy_match_product(
         return None, 0.0
 
 
+def _match_unique_names(
+    catalog: ProductCatalog,
+    names: List[str],
+    results: List[Tuple[Optional[int], float]],
+    threshold: float
+) -> None:
+    """
+    Заполняет results результатами сопоставления непустых уникальных names с catalog.
+
+    Результаты записываются по мере вычисления, поэтому при ошибке
+    на позднем шаге уже найденные совпадения сохраняются.
+    """
+    if not catalog.names:
+        return
+
+    # Нормализуем названия один раз для всех проверок, как и названия каталога
+    lowered = [normalize_product_name(name) for name in names]
+
+    # Точные совпадения без учета регистра
+    pending = []
+    for i, name_lower in enumerate(lowered):
+        idx = catalog.exact_index.get(name_lower)
+        if idx is not None:
+            results[i] = (catalog.ids[idx], 1.0)
+        else:
+            pending.append(i)
+
+    if not pending:
+        return
+
+    # Совпадения по алиасу: token_set_ratio по нормализованным строкам
+    alias_scores = process.cdist(
+        [lowered[i] for i in pending],
+        catalog.names_lower,
+        scorer=fuzz.token_set_ratio,
+        workers=-1
+    )
+
+    fuzzy_pending = []
+    for row, i in enumerate(pending):
+        best = int(alias_scores[row].argmax())
+        if alias_scores[row, best] >= ALIAS_MATCH_THRESHOLD:
+            results[i] = (catalog.ids[best], 1.0)
+        else:
+            fuzzy_pending.append(i)
+
+    if not fuzzy_pending:
+        return
+
+    # Нечеткий поиск для оставшихся названий
+    scores = process.cdist(
+        [names[i] for i in fuzzy_pending],
+        catalog.names,
+        scorer=fuzz.token_sort_ratio,
+        workers=-1
+    )
+    for row, i in enumerate(fuzzy_pending):
+        best = int(scores[row].argmax())
+        normalized_score = float(scores[row, best]) / 100.0
+        if normalized_score >= threshold:
+            results[i] = (catalog.ids[best], normalized_score)
+        else:
+            results[i] = (None, normalized_score)
+
+
+async def fuzzy_match_products(
+    names: List[str],
+    threshold: Optional[float] = None
+) -> List[Tuple[Optional[int], float]]:
+    """
+    Сопоставляет сразу все названия из накладной с каталогом товаров.
+
+    Повторяет шаги fuzzy_match_product (точное совпадение, совпадение
+    по алиасу, нечеткий поиск), но считает матрицу схожести для всех
+    названий одним вызовом process.cdist вместо поиска по каждой позиции.
+    Повторяющиеся в накладной названия сопоставляются один раз.
+
+    Args:
+        names: Названия товаров для поиска (пустые строки пропускаются)
+        threshold: Порог схожести, ниже которого товары игнорируются
+
+    Returns:
+        Список пар (id товара или None, степень схожести) в порядке names
+    """
+    if threshold is None:
+        threshold = DEFAULT_THRESHOLD
+
+    if not names:
+        return []
+
+    unique_names = list(dict.fromkeys(name for name in names if name))
+    by_name: Dict[str, Tuple[Optional[int], float]] = {}
+    misses: List[str] = []
+    miss_results: List[Tuple[Optional[int], float]] = []
+
+    try:
+        # Берем из кеша названия, уже сопоставленные с текущим каталогом
+        catalog = get_product_catalog()
+        cache = _get_match_cache(catalog)
+        for name in unique_names:
+            key = (name, threshold)
+            if key in cache:
+                cache.move_to_end(key)
+                by_name[name] = cache[key]
+            else:
+                misses.append(name)
+
+        miss_results = [(None, 0.0)] * len(misses)
+        if misses:
+            # cdist работает в нативном коде, поэтому выносим расчет из event loop
+            await asyncio.to_thread(
+                _match_unique_names, catalog, misses, miss_results, threshold
+            )
+
+        for name, result in zip(misses, miss_results):
+            cache[(name, threshold)] = result
+        while len(cache) > MATCH_CACHE_SIZE:
+            cache.popitem(last=False)
+    except Exception as e:
+        # Частичные результаты используем, но в кеш они не попадают
+        logger.error("Error during batch fuzzy matching", error=str(e))
+
+    by_name.update(zip(misses, miss_results))
+
+    # Раскладываем результаты обратно по всем позициям, включая повторы
+    results = [by_name.get(name, (None, 0.0)) for name in names]
+
+    logger.info("Batch fuzzy matching completed",
+               names_count=len(names),
+               unique_count=len(unique_names),
+               cached_count=len(unique_names) - len(misses),
+               matched_count=sum(1 for pid, _ in results if pid is not None))
+
+    return results
+
+
 async def find_similar_products(
     name: str, 
     limit: int = MAX_SIMILAR_PRODUCTS,
@@ -120,16 +279,13 @@ async def find_similar_products(
     if not name:
         return []
     
-    # Создаем словарь для поиска
-    products_list = PRODUCTS.to_dict("records")
-    product_dict = {p["id"]: p for p in products_list}
-    choices = {p["id"]: p["name"] for p in products_list}
-    
     try:
+        catalog = get_product_catalog()
+        
         # Выполняем нечеткий поиск
         matches = process.extract(
             name, 
-            choices=choices.values(),
+            choices=catalog.names,
             scorer=fuzz.token_sort_ratio, 
             limit=limit
         )
@@ -140,9 +296,10 @@ async def find_similar_products(
         for match_data in matches:
             # Обрабатываем разные форматы результата
             if len(match_data) == 3:  # формат (match, score, index)
-                match_name, score, _ = match_data
+                match_name, score, idx = match_data
             elif len(match_data) == 2:  # формат (match, score)
                 match_name, score = match_data
+                idx = catalog.names.index(match_name)
             else:
                 logger.error("Unexpected format from rapidfuzz", match_format=match_data)
                 continue
@@ -152,22 +309,10 @@ async def find_similar_products(
             if normalized_score < threshold:
                 continue
             
-            # Находим товар по имени
-            product_id = None
-            for pid, pname in choices.items():
-                if pname == match_name:
-                    product_id = pid
-                    break
-            
-            if product_id is None:
-                continue
-            
-            product = product_dict[product_id]
-            
             result_products.append({
-                "id": product["id"],
-                "name": product["name"],
-                "unit": product["measureName"],
+                "id": catalog.ids[idx],
+                "name": catalog.names[idx],
+                "unit": catalog.units[idx],
                 "confidence": normalized_score
             })
         
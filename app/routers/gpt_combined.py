@@ -24,6 +24,27 @@ from app.utils.telegram_utils import download_file
 
 logger = structlog.get_logger()
 
+# Общий HTTP-клиент с пулом соединений: запросы к OpenAI переиспользуют
+# TCP/TLS-соединения вместо нового рукопожатия на каждую накладную
+_HTTP_CLIENT: Optional[httpx.AsyncClient] = None
+_HTTP_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10)
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Возвращает общий httpx.AsyncClient, создавая его при первом обращении."""
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None or _HTTP_CLIENT.is_closed:
+        _HTTP_CLIENT = httpx.AsyncClient(timeout=120, limits=_HTTP_LIMITS)
+    return _HTTP_CLIENT
+
+
+async def close_http_client() -> None:
+    """Закрывает общий HTTP-клиент (вызывается при остановке бота)."""
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is not None:
+        await _HTTP_CLIENT.aclose()
+        _HTTP_CLIENT = None
+
 
 # --------------------------------------------------------------------------- #
 #  Базовые служебные функции
@@ -62,9 +83,8 @@ async def _call_combined_api(image_bytes: bytes) -> Tuple[str, Dict[str, Any]]:
 
     data_url = make_data_url(image_bytes, filename=debug_path)
     payload = _build_payload(data_url)
-    # Для логирования — копия payload без base64
-    safe_payload = _build_payload('[OMITTED]')
-    logger.info("OpenAI payload", payload=safe_payload)
+    # Логируем только сводку запроса: промпт и изображение в лог не пишем
+    logger.info("OpenAI request", model=payload.get("model"), image_size=len(image_bytes))
 
     headers = {
         "Authorization": f"Bearer {settings.openai_api_key}",
@@ -72,15 +92,15 @@ async def _call_combined_api(image_bytes: bytes) -> Tuple[str, Dict[str, Any]]:
     }
 
     try:
-        async with httpx.AsyncClient(timeout=120) as client:
-            resp = await client.post(settings.gpt_ocr_url, json=payload, headers=headers)
-            resp.raise_for_status()
-            data = resp.json()
+        client = _get_http_client()
+        resp = await client.post(settings.gpt_ocr_url, json=payload, headers=headers)
+        resp.raise_for_status()
+        data = resp.json()
     except httpx.HTTPStatusError as e:
-        logger.error("OpenAI API HTTP error", status_code=e.response.status_code, payload=safe_payload, response_text=e.response.text[:500])
+        logger.error("OpenAI API HTTP error", status_code=e.response.status_code, response_text=e.response.text[:500])
         raise
     except Exception as e:
-        logger.error("OpenAI API error", error=str(e), payload=safe_payload)
+        logger.error("OpenAI API error", error=str(e))
         raise
 
     try:
@@ -414,31 +434,32 @@ async def call_openai_with_retry(text: str) -> Dict[str, Any]:
     }
 
     try:
-        async with httpx.AsyncClient(timeout=60) as client:
-            resp = await client.post(
-                settings.gpt_chat_url,
-                json=payload,
-                headers=headers
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            
-            content = (
-                data.get("choices", [{}])[0]
-                .get("message", {})
-                .get("content", "")
-                .strip()
-            )
-            
-            # Извлекаем JSON из ответа
-            json_start = content.find("{")
-            json_end = content.rfind("}")
-            if json_start == -1 or json_end == -1:
-                raise ValueError("No JSON found in response")
-                
-            json_str = content[json_start:json_end + 1]
-            return json.loads(json_str)
+        client = _get_http_client()
+        resp = await client.post(
+            settings.gpt_chat_url,
+            json=payload,
+            headers=headers,
+            timeout=60
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        
+        content = (
+            data.get("choices", [{}])[0]
+            .get("message", {})
+            .get("content", "")
+            .strip()
+        )
+        
+        # Извлекаем JSON из ответа
+        json_start = content.find("{")
+        json_end = content.rfind("}")
+        if json_start == -1 or json_end == -1:
+            raise ValueError("No JSON found in response")
             
+        json_str = content[json_start:json_end + 1]
+        return json.loads(json_str)
+        
     except Exception as e:
         logger.error("OpenAI API error", error=str(e))
         raise
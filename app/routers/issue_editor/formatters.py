@@ -12,14 +12,20 @@ from app.config.issue_editor_constants import (
     CB_PAGE_PREFIX,
     CB_PRODUCT_PREFIX,
     CB_ACTION_PREFIX,
-    CB_UNIT_PREFIX,
-    CB_CONVERT_PREFIX,
     CB_BACK,
     CB_SEARCH,
     PAGE_SIZE
 )
 from .constants import CB_CANCEL
 
+# Клавиатура итогового сообщения не зависит от данных, создаем ее один раз
+_SUMMARY_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [
+        InlineKeyboardButton(text="✅ Подтвердить", callback_data="inv_ok"),
+        InlineKeyboardButton(text="✏️ Редактировать", callback_data="inv_edit")
+    ]
+])
+
 def get_issue_icon(issue: Dict[str, Any]) -> str:
     """
     Возвращает иконку для типа проблемы.
@@ -51,33 +57,32 @@ async def format_summary_message(data: Dict[str, Any]) -> Tuple[str, InlineKeybo
     Returns:
         Tuple[str, InlineKeyboardMarkup]: (текст сообщения, клавиатура)
     """
-    text = "📋 *Итоговая информация*\n\n"
-    
-    # Добавляем информацию о поставщике
-    text += f"*Поставщик:* {data.get('supplier', 'Не указан')}\n"
-    text += f"*Дата:* {data.get('date', 'Не указана')}\n"
-    text += f"*Номер:* {data.get('number', 'Не указан')}\n\n"
+    # Собираем строки сообщения за один проход и соединяем один раз
+    lines = [
+        "📋 *Итоговая информация*",
+        "",
+        f"*Поставщик:* {data.get('supplier', 'Не указан')}",
+        f"*Дата:* {data.get('date', 'Не указана')}",
+        f"*Номер:* {data.get('number', 'Не указан')}",
+        "",
+        "*Позиции:*",
+    ]
     
     # Добавляем список позиций
-    text += "*Позиции:*\n"
-    for pos in data.get("positions", []):
-        if not pos.get("deleted", False):
-            text += f"• {pos.get('name', 'Без названия')} - "
-            text += f"{pos.get('quantity', 0)} {pos.get('unit', 'шт')} - "
-            text += f"{pos.get('price', 0)} ₽\n"
+    lines.extend(
+        f"• {pos.get('name', 'Без названия')} - "
+        f"{pos.get('quantity', 0)} {pos.get('unit', 'шт')} - "
+        f"{pos.get('price', 0)} ₽"
+        for pos in data.get("positions", [])
+        if not pos.get("deleted", False)
+    )
     
     # Добавляем общую сумму
-    text += f"\n*Итого:* {data.get('total_sum', 0)} ₽"
-    
-    # Создаем клавиатуру
-    keyboard = InlineKeyboardMarkup(inline_keyboard=[
-        [
-            InlineKeyboardButton(text="✅ Подтвердить", callback_data="inv_ok"),
-            InlineKeyboardButton(text="✏️ Редактировать", callback_data="inv_edit")
-        ]
-    ])
+    lines.append("")
+    lines.append(f"*Итого:* {data.get('total_sum', 0)} ₽")
+    text = "\n".join(lines)
     
-    return text, keyboard
+    return text, _SUMMARY_KB
 
 async def format_issues_list(
     data: Dict[str, Any], 
@@ -96,25 +101,26 @@ async def format_issues_list(
     issues = data.get("issues", [])
     total_pages = (len(issues) + PAGE_SIZE - 1) // PAGE_SIZE
     
-    text = "📝 *Список проблем для редактирования*\n\n"
+    parts = ["📝 *Список проблем для редактирования*\n\n"]
     
     # Добавляем проблемы для текущей страницы
     start_idx = page * PAGE_SIZE
-    end_idx = min(start_idx + PAGE_SIZE, len(issues))
+    page_issues = issues[start_idx:start_idx + PAGE_SIZE]
     
-    for i, issue in enumerate(issues[start_idx:end_idx], start=start_idx + 1):
+    for i, issue in enumerate(page_issues, start=start_idx + 1):
         icon = get_issue_icon(issue)
-        text += f"{i}. {icon} {issue.get('description', 'Без описания')}\n"
+        parts.append(f"{i}. {icon} {issue.get('description', 'Без описания')}\n")
     
     # Добавляем информацию о страницах
     if total_pages > 1:
-        text += f"\nСтраница {page + 1} из {total_pages}"
+        parts.append(f"\nСтраница {page + 1} из {total_pages}")
+    text = "".join(parts)
     
     # Создаем клавиатуру
     keyboard = []
     
     # Кнопки для проблем
-    for i, issue in enumerate(issues[start_idx:end_idx], start=start_idx + 1):
+    for i, issue in enumerate(page_issues, start=start_idx + 1):
         keyboard.append([
             InlineKeyboardButton(
                 text=f"{i}. {issue.get('description', '')[:30]}...",
@@ -155,15 +161,18 @@ async def format_issue_edit(
     Returns:
         Tuple[str, InlineKeyboardMarkup]: (текст сообщения, клавиатура)
     """
-    text = "✏️ *Редактирование*\n\n"
-    
-    # Добавляем описание проблемы
-    text += f"*Проблема:* {issue.get('description', 'Без описания')}\n\n"
-    
-    # Добавляем текущие значения
-    text += "*Текущие значения:*\n"
-    for field, value in issue.get("current_values", {}).items():
-        text += f"• {field}: {value}\n"
+    parts = [
+        "✏️ *Редактирование*\n\n",
+        # Описание проблемы
+        f"*Проблема:* {issue.get('description', 'Без описания')}\n\n",
+        # Текущие значения
+        "*Текущие значения:*\n",
+    ]
+    parts.extend(
+        f"• {field}: {value}\n"
+        for field, value in issue.get("current_values", {}).items()
+    )
+    text = "".join(parts)
     
     # Создаем клавиатуру
     keyboard = []
@@ -201,13 +210,16 @@ async def format_product_select(
     Returns:
         Tuple[str, InlineKeyboardMarkup]: (текст сообщения, клавиатура)
     """
-    text = f"🔍 *Поиск товаров: {query}*\n\n"
+    parts = [f"🔍 *Поиск товаров: {query}*\n\n"]
     
     if not products:
-        text += "Товары не найдены"
+        parts.append("Товары не найдены")
     else:
-        for i, product in enumerate(products, 1):
-            text += f"{i}. {product['name']} ({product['unit']})\n"
+        parts.extend(
+            f"{i}. {product['name']} ({product['unit']})\n"
+            for i, product in enumerate(products, 1)
+        )
+    text = "".join(parts)
     
     # Создаем клавиатуру
     keyboard = []
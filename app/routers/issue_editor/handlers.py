@@ -4,8 +4,9 @@
 Этот модуль содержит обработчики для различных действий в issue_editor.
 """
 
+from typing import Dict, Any, List
+
 import structlog
-from typing import Dict, Any, Optional
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.fsm.context import FSMContext
@@ -17,10 +18,7 @@ from app.config.issue_editor_constants import (
     CB_PRODUCT_PREFIX,
     CB_ACTION_PREFIX,
     CB_UNIT_PREFIX,
-    CB_CONVERT_PREFIX,
     CB_BACK,
-    CB_CANCEL,
-    CB_CONFIRM,
     CB_REVIEW,
     CB_SEARCH
 )
@@ -28,14 +26,43 @@ from .formatters import (
     format_summary_message,
     format_issues_list,
     format_issue_edit,
-    format_product_select,
     format_field_prompt
 )
-from .utils import get_products_by_name, save_product_match
 
 logger = structlog.get_logger()
 router = Router(name="issue_editor_handlers")
 
+# Клавиатура с единственной кнопкой "Назад" не меняется, создаем ее один раз
+_BACK_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="◀️ Назад", callback_data=CB_BACK)]
+])
+
+def _store_current_issue(data: Dict[str, Any], current_issue: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Записывает отредактированную проблему обратно в список проблем.
+    
+    Использует позицию, сохраненную при выборе проблемы; поиск по id
+    выполняется только если позиция отсутствует или устарела.
+    
+    Args:
+        data: данные состояния
+        current_issue: отредактированная проблема
+        
+    Returns:
+        List[Dict[str, Any]]: обновленный список проблем
+    """
+    issues = data.get("issues", [])
+    idx = data.get("current_issue_idx")
+    if idx is not None and 0 <= idx < len(issues) and issues[idx].get("id") == current_issue.get("id"):
+        issues[idx] = current_issue
+        return issues
+    
+    for i, issue in enumerate(issues):
+        if issue.get("id") == current_issue.get("id"):
+            issues[i] = current_issue
+            break
+    return issues
+
 @router.callback_query(F.data == CB_BACK)
 async def cb_back(c: CallbackQuery, state: FSMContext):
     """Обработчик кнопки 'Назад'."""
@@ -65,9 +92,9 @@ async def cb_back(c: CallbackQuery, state: FSMContext):
         await c.message.edit_text(text, reply_markup=keyboard)
         await state.set_state(InvoiceEditStates.issue_edit)
 
-@router.callback_query((F.data == "inv_edit") | (F.data == CB_REVIEW))
+@router.callback_query(F.data == CB_REVIEW)
 async def cb_start_review(c: CallbackQuery, state: FSMContext):
-    """Обработчик начала редактирования."""
+    """Обработчик начала редактирования (inv_edit обрабатывает telegram_bot.cb_edit_invoice)."""
     data = await state.get_data()
     
     # Форматируем список проблем
@@ -98,8 +125,9 @@ async def cb_select_issue(c: CallbackQuery, state: FSMContext):
     # Получаем проблему
     issue = issues[issue_idx]
     
-    # Сохраняем текущую проблему в состоянии
-    await state.update_data(current_issue=issue)
+    # Сохраняем текущую проблему и ее позицию в списке, чтобы при сохранении
+    # правки не искать проблему заново
+    await state.update_data(current_issue=issue, current_issue_idx=issue_idx)
     
     # Форматируем форму редактирования
     text, keyboard = await format_issue_edit(issue)
@@ -110,7 +138,7 @@ async def cb_select_issue(c: CallbackQuery, state: FSMContext):
     # Устанавливаем состояние
     await state.set_state(InvoiceEditStates.issue_edit)
 
-@router.callback_query(lambda c: c.data and c.data.startswith(CB_PAGE_PREFIX))
+@router.callback_query(F.data.startswith(CB_PAGE_PREFIX))
 async def cb_change_page(c: CallbackQuery, state: FSMContext):
     """Обработчик смены страницы."""
     data = await state.get_data()
@@ -145,18 +173,16 @@ async def cb_select_product(c: CallbackQuery, state: FSMContext):
         await c.answer("Ошибка: неверный ID товара")
         return
     
-    # Обновляем проблему
-    current_issue["product_id"] = product_id
-    current_issue["resolved"] = True
-    
-    # Сохраняем обновленную проблему
-    issues = data.get("issues", [])
-    for i, issue in enumerate(issues):
-        if issue.get("id") == current_issue.get("id"):
-            issues[i] = current_issue
-            break
-    
-    await state.update_data(issues=issues, current_issue=current_issue)
+    # Повторный выбор того же товара ничего не меняет: состояние не перезаписываем
+    if not (current_issue.get("resolved") and current_issue.get("product_id") == product_id):
+        # Обновляем проблему
+        current_issue["product_id"] = product_id
+        current_issue["resolved"] = True
+        
+        # Сохраняем обновленную проблему
+        issues = _store_current_issue(data, current_issue)
+        
+        await state.update_data(issues=issues, current_issue=current_issue)
     
     # Возвращаемся к списку проблем
     text, keyboard = await format_issues_list(data)
@@ -177,9 +203,7 @@ async def cb_action_with_item(c: CallbackQuery, state: FSMContext):
         await state.set_state(InvoiceEditStates.product_select)
         await c.message.edit_text(
             "🔍 Введите название товара для поиска:",
-            reply_markup=InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(text="◀️ Назад", callback_data=CB_BACK)]
-            ])
+            reply_markup=_BACK_KB
         )
     elif field in ["unit", "quantity", "price"]:
         # Переходим к вводу значения поля
@@ -222,20 +246,17 @@ async def cb_select_unit(c: CallbackQuery, state: FSMContext):
     # Получаем единицу измерения из callback_data
     unit = c.data[len(CB_UNIT_PREFIX):]
     
-    # Обновляем значение
-    if "current_values" not in current_issue:
-        current_issue["current_values"] = {}
-    current_issue["current_values"]["unit"] = unit
-    current_issue["resolved"] = True
-    
-    # Сохраняем обновленную проблему
-    issues = data.get("issues", [])
-    for i, issue in enumerate(issues):
-        if issue.get("id") == current_issue.get("id"):
-            issues[i] = current_issue
-            break
-    
-    await state.update_data(issues=issues, current_issue=current_issue)
+    # Повторный выбор той же единицы ничего не меняет: состояние не перезаписываем
+    current_values = current_issue.setdefault("current_values", {})
+    if not (current_issue.get("resolved") and current_values.get("unit") == unit):
+        # Обновляем значение
+        current_values["unit"] = unit
+        current_issue["resolved"] = True
+        
+        # Сохраняем обновленную проблему
+        issues = _store_current_issue(data, current_issue)
+        
+        await state.update_data(issues=issues, current_issue=current_issue)
     
     # Возвращаемся к списку проблем
     text, keyboard = await format_issues_list(data)
@@ -247,9 +268,7 @@ async def cb_search_product(c: CallbackQuery, state: FSMContext):
     """Обработчик поиска товаров."""
     await c.message.edit_text(
         "🔍 Введите название товара для поиска:",
-        reply_markup=InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="◀️ Назад", callback_data=CB_BACK)]
-        ])
+        reply_markup=_BACK_KB
     )
 
 @router.message(F.state == InvoiceEditStates.field_input)
@@ -279,11 +298,7 @@ async def process_field_input(message: Message, state: FSMContext):
         current_issue["resolved"] = True
         
         # Сохраняем обновленную проблему
-        issues = data.get("issues", [])
-        for i, issue in enumerate(issues):
-            if issue.get("id") == current_issue.get("id"):
-                issues[i] = current_issue
-                break
+        issues = _store_current_issue(data, current_issue)
         
         await state.update_data(issues=issues, current_issue=current_issue)
         
@@ -295,7 +310,5 @@ async def process_field_input(message: Message, state: FSMContext):
     except ValueError:
         await message.answer(
             "❌ Ошибка: введите корректное числовое значение",
-            reply_markup=InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(text="◀️ Назад", callback_data=CB_BACK)]
-            ])
+            reply_markup=_BACK_KB
         ) 
\ No newline at end of file
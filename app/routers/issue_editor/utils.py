@@ -5,10 +5,10 @@
 """
 
 import structlog
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any
 import pandas as pd
 
-from app.core.data_loader import PRODUCTS, load_data
+from app.core.data_loader import get_products_details
 from app.routers.fuzzy_match import find_similar_products
 
 logger = structlog.get_logger()
@@ -57,57 +57,76 @@ async def save_product_match(
     Returns:
         bool: True если сохранение успешно
     """
+    return await save_product_matches([{
+        "product_id": product_id,
+        "original_name": original_name,
+        "confidence": confidence
+    }])
+
+async def save_product_matches(matches: List[Dict[str, Any]]) -> bool:
+    """
+    Сохраняет несколько сопоставлений товаров в CSV за одно чтение и одну запись файла.
+    
+    Существующие сопоставления с тем же исходным названием заменяются.
+    Если хотя бы одно сопоставление неполное или товар не найден
+    в справочнике, ничего не сохраняется.
+    
+    Args:
+        matches: Сопоставления с ключами product_id, original_name и confidence
+        
+    Returns:
+        bool: True если сохранение успешно
+    """
+    if not matches:
+        return True
+    
+    # Без названия или ID сопоставление сохранять нечего
+    if any(not m.get("original_name") or not m.get("product_id") for m in matches):
+        logger.error("Incomplete product match", matches=matches)
+        return False
+    
     try:
-        # Получаем информацию о товаре
-        if PRODUCTS is None:
-            load_data()
-            
-        product_mask = PRODUCTS["id"] == product_id
-        if not product_mask.any():
-            logger.error("Product not found", product_id=product_id)
+        # Получаем информацию обо всех товарах одной выборкой
+        products = get_products_details(m["product_id"] for m in matches)
+        missing = [m["product_id"] for m in matches if m["product_id"] not in products]
+        if missing:
+            logger.error("Product not found", product_ids=missing)
             return False
-            
-        product = PRODUCTS[product_mask].iloc[0]
         
-        # Создаем новую запись для learned_products.csv
-        new_match = pd.DataFrame([{
-            "original_name": original_name,
-            "product_id": product_id,
-            "product_name": product["name"],
-            "confidence": confidence,
-            "is_verified": True
-        }])
+        # Создаем новые записи для learned_products.csv
+        # (при повторе исходного названия побеждает последнее сопоставление)
+        new_matches = pd.DataFrame([
+            {
+                "original_name": m["original_name"],
+                "product_id": m["product_id"],
+                "product_name": products[m["product_id"]]["name"],
+                "confidence": m["confidence"],
+                "is_verified": True
+            }
+            for m in matches
+        ]).drop_duplicates("original_name", keep="last")
         
-        # Добавляем в CSV
+        # Добавляем в CSV, заменяя прежние записи с теми же названиями
         csv_path = "data/learned_products.csv"
         try:
             existing = pd.read_csv(csv_path)
-            # Проверяем, нет ли уже такого сопоставления
-            mask = existing["original_name"] == original_name
-            if mask.any():
-                # Обновляем существующую запись
-                existing.loc[mask] = new_match.iloc[0]
-                existing.to_csv(csv_path, index=False)
-            else:
-                # Добавляем новую запись
-                pd.concat([existing, new_match]).to_csv(csv_path, index=False)
+            kept = existing[~existing["original_name"].isin(new_matches["original_name"])]
+            pd.concat([kept, new_matches]).to_csv(csv_path, index=False)
         except FileNotFoundError:
             # Создаем новый файл
-            new_match.to_csv(csv_path, index=False)
+            new_matches.to_csv(csv_path, index=False)
             
         logger.info(
-            "Product match saved",
-            original_name=original_name,
-            product_id=product_id,
-            confidence=confidence
+            "Product matches saved",
+            count=len(new_matches),
+            original_names=new_matches["original_name"].tolist()
         )
         return True
         
     except Exception as e:
         logger.exception(
-            "Failed to save product match",
+            "Failed to save product matches",
             error=str(e),
-            original_name=original_name,
-            product_id=product_id
+            original_names=[m.get("original_name") for m in matches]
         )
-        return False 
\ No newline at end of file
+        return False
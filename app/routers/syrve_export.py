@@ -1,5 +1,7 @@
 __all__ = ["export_to_syrve"]
 
+import asyncio
+
 import httpx
 from app.config.settings import get_settings
 from app.utils.xml_generator import generate_syrve_xml
@@ -8,7 +10,8 @@ settings = get_settings()
 
 async def export_to_syrve(invoice_data: dict):
     """Генерирует XML, отправляет в Syrve, возвращает (bool, message)"""
-    xml_data = generate_syrve_xml(invoice_data)
+    # Генерация XML синхронная, выносим ее из event loop
+    xml_data = await asyncio.to_thread(generate_syrve_xml, invoice_data)
     try:
         async with httpx.AsyncClient(timeout=30) as client:
             headers = {
@@ -9,7 +9,10 @@ This module handles all Telegram bot interactions including:
 
 from __future__ import annotations
 
+import asyncio
+import copy
 import structlog
+from collections import OrderedDict
 from typing import Dict, List, Any, Tuple
 import math
 
@@ -24,92 +27,36 @@ from aiogram.types import (
 )
 
 # Импортируем unified_match для работы с сопоставлением товаров
-from app.routers.fuzzy_match import fuzzy_match_product, find_similar_products
+from app.routers.fuzzy_match import fuzzy_match_products, find_similar_products
 from app.routers.syrve_export import export_to_syrve
 
+# Объединенный OCR+Parsing импортируем один раз при загрузке модуля,
+# а не при каждой обработке фото
+try:
+    from app.routers.gpt_combined import ocr_and_parse
+except ImportError:
+    ocr_and_parse = None
+
 # Импортируем функции для создания UI
-from app.utils.message_formatter import build_message
+from app.utils.message_formatter import build_message, build_message_parts
 
 # Импортируем состояния FSM
 from app.models.invoice_state import InvoiceStates, InvoiceEditStates
 
 # Импортируем настройки
 from app.config.settings import get_settings
+from app.core.constants import ISSUE_ICONS
 
 # Импортируем функции работы с данными
-from app.core.data_loader import get_supplier, get_product_details, load_data
+from app.core.data_loader import (
+    get_supplier,
+    get_products_details,
+    get_product_catalog,
+    load_data
+)
 
-# Импортируем модуль unit_converter, если он доступен
-try:
-    from app.utils.unit_converter import normalize_unit, is_compatible_unit
-    UNIT_CONVERTER_AVAILABLE = True
-except ImportError:
-    UNIT_CONVERTER_AVAILABLE = False
-    
-    # Unit normalization dictionary
-    UNIT_ALIASES: Dict[str, str] = {
-        # English volume units
-        "l": "l", "ltr": "l", "liter": "l", "liters": "l", "litre": "l", "litres": "l",
-        "ml": "ml", "milliliter": "ml", "milliliters": "ml", "millilitre": "ml",
-        "millilitres": "ml",
-        
-        # English weight units
-        "kg": "kg", "kilo": "kg", "kilogram": "kg", "kilograms": "kg",
-        "g": "g", "gr": "g", "gram": "g", "grams": "g",
-        
-        # English countable units
-        "pcs": "pcs", "pc": "pcs", "piece": "pcs", "pieces": "pcs",
-        "pack": "pack", "package": "pack", "pkg": "pack",
-        "box": "box", "boxes": "box",
-        
-        # Indonesian volume units
-        "liter": "l", "lt": "l",
-        "mililiter": "ml", "mili": "ml",
-        
-        # Indonesian weight units
-        "kilogram": "kg", "kilo": "kg",
-        "gram": "g",
-        
-        # Indonesian countable units
-        "buah": "pcs", "biji": "pcs", "pcs": "pcs", "potong": "pcs",
-        "paket": "pack", "pak": "pack",
-        "kotak": "box", "dus": "box", "kardus": "box",
-        
-        # Common abbreviations
-        "ea": "pcs",  # each
-        "btl": "pcs"  # bottle/botol
-    }
-    
-    def normalize_unit(unit_str: str) -> str:
-        """Normalize unit string to standard format."""
-        if not unit_str:
-            return ""
-        unit_str = unit_str.lower().strip()
-        return UNIT_ALIASES.get(unit_str, unit_str)
-    
-    def is_compatible_unit(unit1: str, unit2: str) -> bool:
-        """Check if two units are compatible (can be converted between each other)."""
-        unit1 = normalize_unit(unit1)
-        unit2 = normalize_unit(unit2)
-        
-        # Same normalized units are always compatible
-        if unit1 == unit2:
-            return True
-        
-        # Check unit categories
-        volume_units = {"l", "ml"}
-        weight_units = {"kg", "g"}
-        countable_units = {"pcs", "pack", "box"}
-        
-        if unit1 in volume_units and unit2 in volume_units:
-            return True
-        if unit1 in weight_units and unit2 in weight_units:
-            return True
-        if unit1 in countable_units and unit2 in countable_units:
-            # Countable units technically aren't directly convertible without 
-            # additional knowledge (e.g., how many pieces in a pack)
-            return False
-        return False
+# Импортируем функции работы с единицами измерения
+from app.utils.unit_converter import normalize_unit, is_compatible_normalized
 
 logger = structlog.get_logger()
 router = Router(name=__name__)
@@ -119,6 +66,28 @@ load_data()
 
 settings = get_settings()
 
+# Ограничиваем число одновременных запросов OCR+Parsing к внешнему API
+# (семафор создается при первом запросе, уже внутри работающего event loop)
+_OCR_SEMAPHORE: asyncio.Semaphore | None = None
+
+# LRU-кеш результатов OCR+Parsing по file_unique_id фото: повторная
+# отправка того же фото не запускает распознавание заново
+_PIPELINE_CACHE_SIZE = 256
+_PIPELINE_CACHE: "OrderedDict[str, dict]" = OrderedDict()
+# Блокировка на каждое фото и число корутин, которые ее держат или ждут:
+# блокировка удаляется, только когда она больше никому не нужна
+_PIPELINE_LOCKS: Dict[str, asyncio.Lock] = {}
+_PIPELINE_WAITERS: Dict[str, int] = {}
+
+# Клавиатуры предпросмотра накладной не меняются, создаем их один раз
+_PREVIEW_KB_WITH_ISSUES = InlineKeyboardMarkup(inline_keyboard=[[
+    InlineKeyboardButton(text="✅ Подтвердить", callback_data="inv_ok"),
+    InlineKeyboardButton(text="✏️ Исправить", callback_data="inv_edit")
+]])
+_PREVIEW_KB_NO_ISSUES = InlineKeyboardMarkup(inline_keyboard=[[
+    InlineKeyboardButton(text="✅ Подтвердить и отправить", callback_data="inv_ok")
+]])
+
 
 def _safe_str(value: Any) -> str:
     """Безопасно преобразует значение в строку и удаляет пробелы.
@@ -141,47 +110,99 @@ def _safe_str(value: Any) -> str:
         return ""
 
 
+def _get_ocr_semaphore() -> asyncio.Semaphore:
+    """Возвращает семафор OCR, создавая его в текущем event loop."""
+    global _OCR_SEMAPHORE
+    if _OCR_SEMAPHORE is None:
+        _OCR_SEMAPHORE = asyncio.Semaphore(settings.max_concurrent_ocr or 5)
+    return _OCR_SEMAPHORE
+
+
 async def _run_pipeline(file_id: str, bot: Bot) -> dict:
     """Фото в Telegram → структурированный словарь (OCR+Parsing)."""
     try:
-        # Пытаемся использовать оптимизированный объединенный вызов
-        try:
-            from app.routers.gpt_combined import ocr_and_parse
-            _, parsed_data = await ocr_and_parse(file_id, bot)
-            logger.info(
-                "Combined OCR+Parsing completed successfully",
-                positions_count=len(parsed_data.get("positions", []))
-            )
-            return parsed_data
-        except ImportError:
-            # Если модуль недоступен, используем отдельные вызовы
+        if ocr_and_parse is None:
             raise RuntimeError("gpt_combined.py должен быть в проекте!")
+        async with _get_ocr_semaphore():
+            _, parsed_data = await ocr_and_parse(file_id, bot)
+        logger.info(
+            "Combined OCR+Parsing completed successfully",
+            positions_count=len(parsed_data.get("positions", []))
+        )
+        return parsed_data
     except Exception as exc:
         logger.exception("Pipeline failed", exc_info=exc)
         raise
 
 
-def calculate_total_sum(positions: list) -> float:
-    """Безопасно вычисляет общую сумму из всех позиций."""
-    total = 0.0
-    for pos in positions:
-        # Пропускаем удаленные позиции
-        if pos.get("deleted", False):
-            continue
-        try:
-            pos_sum = float(pos.get("sum", 0)) if pos.get("sum") else 0
-            total += pos_sum
-        except (ValueError, TypeError):
-            logger.warning(
-                "Invalid sum value",
-                position=pos.get("name"),
-                sum=pos.get("sum")
-            )
-    return total
+async def _run_pipeline_cached(file_id: str, file_unique_id: str, bot: Bot) -> dict:
+    """Запускает _run_pipeline с кешированием результата по file_unique_id фото.
+    
+    Одновременные запросы с одним и тем же фото ждут первый из них,
+    а не запускают распознавание параллельно.
+    
+    Args:
+        file_id: ID файла для скачивания
+        file_unique_id: Постоянный ID фото, ключ кеша
+        bot: Экземпляр бота
+        
+    Returns:
+        dict: Копия распознанных данных накладной
+    """
+    lock = _PIPELINE_LOCKS.setdefault(file_unique_id, asyncio.Lock())
+    _PIPELINE_WAITERS[file_unique_id] = _PIPELINE_WAITERS.get(file_unique_id, 0) + 1
+    try:
+        async with lock:
+            cached = _PIPELINE_CACHE.get(file_unique_id)
+            if cached is not None:
+                _PIPELINE_CACHE.move_to_end(file_unique_id)
+                logger.info("Pipeline cache hit", file_unique_id=file_unique_id)
+                return copy.deepcopy(cached)
+            
+            data = await _run_pipeline(file_id, bot)
+            
+            # Заглушки, возвращаемые при ошибках OCR, не кешируем
+            if not _safe_str(data.get("supplier")).startswith("[MOCK"):
+                _PIPELINE_CACHE[file_unique_id] = copy.deepcopy(data)
+                if len(_PIPELINE_CACHE) > _PIPELINE_CACHE_SIZE:
+                    _PIPELINE_CACHE.popitem(last=False)
+            return data
+    finally:
+        _PIPELINE_WAITERS[file_unique_id] -= 1
+        if not _PIPELINE_WAITERS[file_unique_id]:
+            del _PIPELINE_WAITERS[file_unique_id]
+            del _PIPELINE_LOCKS[file_unique_id]
+
+
+async def _preload_catalog() -> None:
+    """Готовит каталог товаров в отдельном потоке, не блокируя event loop."""
+    await asyncio.to_thread(get_product_catalog)
+
+
+def _safe_float(value: Any) -> float | None:
+    """Преобразует сумму позиции в float без исключений.
+    
+    Args:
+        value: Сумма позиции (число, строка или None)
+        
+    Returns:
+        float | None: Значение суммы, 0.0 для пустых значений
+            или None для некорректных
+    """
+    if not value:
+        return 0.0
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
 
 
 async def _check_supplier(supplier_name: str) -> List[Dict[str, Any]]:
-    """Проверяет поставщика на наличие в базе."""
+    """Проверяет поставщика на наличие в базе.
+    
+    Поиск по таблице поставщиков выполняется в отдельном потоке,
+    чтобы не блокировать event loop во время сопоставления позиций.
+    """
     issues = []
     if not supplier_name:
         issues.append({
@@ -189,7 +210,7 @@ async def _check_supplier(supplier_name: str) -> List[Dict[str, Any]]:
             "message": "❌ Не указан поставщик"
         })
     else:
-        supplier = get_supplier(supplier_name)
+        supplier = await asyncio.to_thread(get_supplier, supplier_name)
         if not supplier:
             issues.append({
                 "type": "supplier_not_found",
@@ -198,10 +219,14 @@ async def _check_supplier(supplier_name: str) -> List[Dict[str, Any]]:
     return issues
 
 
-async def _check_product(name: str, i: int) -> Tuple[List[Dict[str, Any]], str | None]:
+async def _check_product(
+    name: str,
+    i: int,
+    match: Tuple[str | None, float]
+) -> Tuple[List[Dict[str, Any]], str | None]:
     """Проверяет товар на наличие в базе и уверенность сопоставления."""
     issues = []
-    product_id, confidence = await fuzzy_match_product(name)
+    product_id, confidence = match
     if not product_id:
         issues.append({
             "type": "product_not_found",
@@ -235,8 +260,13 @@ def _check_quantity(qty: float, i: int) -> List[Dict[str, Any]]:
     return issues
 
 
-def _check_unit(unit: str, product_id: str | None, i: int) -> List[Dict[str, Any]]:
-    """Проверяет единицы измерения товара."""
+def _check_unit(
+    unit: str,
+    norm_unit: str,
+    product: Dict[str, Any] | None,
+    i: int
+) -> List[Dict[str, Any]]:
+    """Проверяет единицы измерения товара (norm_unit — уже нормализованная unit)."""
     issues = []
     if not unit:
         issues.append({
@@ -244,36 +274,37 @@ def _check_unit(unit: str, product_id: str | None, i: int) -> List[Dict[str, Any
             "message": f"❌ Позиция {i}: не указаны единицы измерения",
             "index": i
         })
-    elif product_id:
-        product = get_product_details(product_id)
-        if product and UNIT_CONVERTER_AVAILABLE:
-            product_unit = _safe_str(product.get("measureName"))
-            # Если у товара не указана единица измерения, добавляем предупреждение
-            if not product_unit:
-                msg = (
-                    f"⚠️ Позиция {i}: у товара в базе не указана единица измерения. "
-                    f"Текущая единица: {unit}"
-                )
-                issues.append({
-                    "type": "unit_missing_in_product",
-                    "message": msg,
-                    "index": i
-                })
-            elif not is_compatible_unit(unit, product_unit):
-                msg = (
-                    f"⚠️ Позиция {i}: несовместимые единицы измерения: "
-                    f"{unit} vs {product_unit}"
-                )
-                issues.append({
-                    "type": "unit_mismatch",
-                    "message": msg,
-                    "index": i
-                })
+    elif product:
+        product_unit = _safe_str(product.get("measureName"))
+        # Если у товара не указана единица измерения, добавляем предупреждение
+        if not product_unit:
+            msg = (
+                f"⚠️ Позиция {i}: у товара в базе не указана единица измерения. "
+                f"Текущая единица: {unit}"
+            )
+            issues.append({
+                "type": "unit_missing_in_product",
+                "message": msg,
+                "index": i
+            })
+        # Единица товара нормализована заранее в load_data
+        elif not is_compatible_normalized(
+            norm_unit, product.get("norm_unit") or normalize_unit(product_unit)
+        ):
+            msg = (
+                f"⚠️ Позиция {i}: несовместимые единицы измерения: "
+                f"{unit} vs {product_unit}"
+            )
+            issues.append({
+                "type": "unit_mismatch",
+                "message": msg,
+                "index": i
+            })
     return issues
 
 
-def _check_total_sum(total: float, positions: List[Dict[str, Any]], i: int) -> List[Dict[str, Any]]:
-    """Проверяет общую сумму накладной."""
+def _check_total_sum(total: float, positions_sum: float, i: int) -> List[Dict[str, Any]]:
+    """Проверяет сумму позиции (positions_sum — уже вычисленная сумма позиции)."""
     issues = []
     if not total or total <= 0:
         issues.append({
@@ -282,7 +313,6 @@ def _check_total_sum(total: float, positions: List[Dict[str, Any]], i: int) -> L
             "index": i
         })
     else:
-        positions_sum = calculate_total_sum(positions)
         if abs(total - positions_sum) > 0.01:  # Допускаем погрешность в 1 копейку
             msg = (
                 f"⚠️ Позиция {i}: сумма позиции ({positions_sum:.2f}) "
@@ -300,20 +330,32 @@ async def analyze_invoice_issues(data: Dict[str, Any]) -> Tuple[List[Dict[str, A
     """Анализирует накладную на наличие проблем."""
     issues = []
     
-    # Проверяем наличие поставщика
     supplier_name = _safe_str(data.get("supplier"))
-    issues.extend(await _check_supplier(supplier_name))
+    positions = data.get("positions") or []
+    names = [_safe_str(pos.get("name")) for pos in positions]
+    
+    # Проверяем поставщика, пока все названия позиций сопоставляются
+    # с каталогом одним пакетным вызовом в отдельном потоке
+    supplier_issues, matches = await asyncio.gather(
+        _check_supplier(supplier_name),
+        fuzzy_match_products(names)
+    )
+    issues.extend(supplier_issues)
     
     # Проверяем позиции
-    positions = data.get("positions", [])
     if not positions:
         issues.append({
             "type": "no_positions",
             "message": "❌ Нет позиций в накладной"
         })
     else:
-        for i, pos in enumerate(positions, 1):
-            name = _safe_str(pos.get("name"))
+        # Получаем детали всех сопоставленных товаров одной выборкой
+        product_details = get_products_details(pid for pid, _ in matches)
+        
+        # Некорректные суммы собираем за тот же проход и логируем один раз
+        invalid_sums = []
+        
+        for i, (pos, name) in enumerate(zip(positions, names), 1):
             if not name:
                 issues.append({
                     "type": "position_no_name",
@@ -323,7 +365,7 @@ async def analyze_invoice_issues(data: Dict[str, Any]) -> Tuple[List[Dict[str, A
                 continue
             
             # Проверяем товар в базе
-            product_issues, product_id = await _check_product(name, i)
+            product_issues, product_id = await _check_product(name, i, matches[i - 1])
             issues.extend(product_issues)
             
             # Проверяем количество
@@ -332,11 +374,20 @@ async def analyze_invoice_issues(data: Dict[str, Any]) -> Tuple[List[Dict[str, A
             
             # Проверяем единицы измерения
             unit = _safe_str(pos.get("unit"))
-            issues.extend(_check_unit(unit, product_id, i))
+            issues.extend(_check_unit(
+                unit, normalize_unit(unit), product_details.get(product_id), i
+            ))
             
-            # Проверяем сумму позиции
+            # Проверяем сумму позиции, разбирая ее один раз прямо в этом проходе
             total = pos.get("sum")
-            issues.extend(_check_total_sum(total, [pos], i))
+            positions_sum = 0.0 if pos.get("deleted", False) else _safe_float(total)
+            if positions_sum is None:
+                invalid_sums.append({"position": name, "sum": total})
+                positions_sum = 0.0
+            issues.extend(_check_total_sum(total, positions_sum, i))
+        
+        if invalid_sums:
+            logger.warning("Invalid sum values", rows=invalid_sums)
     
     # Формируем общее сообщение
     if not issues:
@@ -362,15 +413,39 @@ async def handle_photo(m: Message, state: FSMContext, bot: Bot):
     # Устанавливаем состояние OCR
     await state.set_state(InvoiceStates.ocr)
     
-    # Отправляем уведомление о начале обработки
-    await m.answer("⏳ Обработка накладной...")
-    
-    # Получаем file_id фото с максимальным разрешением
-    file_id = m.photo[-1].file_id
+    # Получаем фото с максимальным разрешением
+    photo = m.photo[-1]
 
     try:
-        # Запускаем пайплайн OCR+Parsing
-        data = await _run_pipeline(file_id, bot)
+        # Запускаем пайплайн OCR+Parsing, а параллельно с ним отправляем
+        # уведомление о начале обработки и готовим каталог товаров
+        data, notice_result, catalog_result = await asyncio.gather(
+            _run_pipeline_cached(photo.file_id, photo.file_unique_id, bot),
+            m.answer("⏳ Обработка накладной..."),
+            _preload_catalog(),
+            return_exceptions=True
+        )
+        if isinstance(data, BaseException):
+            raise data
+        if isinstance(notice_result, BaseException):
+            # Не критично: уведомление лишь информирует пользователя
+            logger.warning("Processing notice was not sent", error=str(notice_result))
+        if isinstance(catalog_result, BaseException):
+            # Не критично: каталог будет загружен повторно при сопоставлении
+            logger.warning("Product catalog preload failed", error=str(catalog_result))
+        
+        # Привязываем список позиций один раз (GPT может вернуть null)
+        positions = data.get("positions") or []
+        data["positions"] = positions
+        
+        # Без позиций анализировать и показывать нечего: сразу просим новое фото
+        if not positions:
+            logger.info("No positions recognized", supplier=data.get("supplier"))
+            await m.answer(
+                "😕 Не удалось распознать ни одной позиции. "
+                "Пожалуйста, сфотографируйте накладную ещё раз."
+            )
+            return
         
         # Анализируем проблемы в распознанной накладной
         issues, parser_comment = await analyze_invoice_issues(data)
@@ -378,40 +453,24 @@ async def handle_photo(m: Message, state: FSMContext, bot: Bot):
         # Добавляем комментарий парсера в данные
         data["parser_comment"] = parser_comment
         
-        # Сохраняем данные в состоянии
-        await state.update_data(
-            invoice=data,
-            issues=issues,
-            parser_comment=parser_comment
-        )
+        # Формируем сообщение с подробным выводом проблемных позиций;
+        # длинные накладные заранее делим на части в пределах лимита Telegram
+        message_parts = build_message_parts(data, issues)
+        
+        # Сохраняем данные в состоянии (комментарий парсера уже внутри invoice)
+        await state.update_data(invoice=data, issues=issues)
         
         # Переходим к отображению предварительного просмотра накладной
         await state.set_state(InvoiceStates.preview)
         
-        # Формируем сообщение с подробным выводом проблемных позиций
-        message = build_message(data, issues)
+        # Выбираем клавиатуру в зависимости от наличия проблемных позиций
+        kb = _PREVIEW_KB_WITH_ISSUES if issues else _PREVIEW_KB_NO_ISSUES
         
-        # Создаем клавиатуру для действий
-        keyboard = []
-        
-        # Добавляем кнопки в зависимости от наличия проблемных позиций
-        if issues:
-            keyboard.append([
-                InlineKeyboardButton(text="✅ Подтвердить", callback_data="inv_ok"),
-                InlineKeyboardButton(text="✏️ Исправить", callback_data="inv_edit")
-            ])
-        else:
-            keyboard.append([
-                InlineKeyboardButton(
-                    text="✅ Подтвердить и отправить",
-                    callback_data="inv_ok"
-                )
-            ])
-        
-        kb = InlineKeyboardMarkup(inline_keyboard=keyboard)
-        
-        # Отправляем сообщение с результатами распознавания
-        await m.answer(message, reply_markup=kb, parse_mode="MarkdownV2")
+        # Отправляем сообщение с результатами распознавания,
+        # клавиатуру прикрепляем только к последней части
+        for part in message_parts[:-1]:
+            await m.answer(part, parse_mode="MarkdownV2")
+        await m.answer(message_parts[-1], reply_markup=kb, parse_mode="MarkdownV2")
         
     except Exception as exc:
         logger.exception("Ошибка обработки фото", exc_info=exc)
@@ -428,9 +487,10 @@ async def handle_photo(m: Message, state: FSMContext, bot: Bot):
 async def cb_confirm_invoice(c: CallbackQuery, state: FSMContext):
     """Обработчик подтверждения накладной"""
     # Получаем данные из состояния
-    data = (await state.get_data()).get("invoice", {})
-    issues = (await state.get_data()).get("issues", [])
-    fixed_issues = (await state.get_data()).get("fixed_issues", {})
+    state_data = await state.get_data()
+    data = state_data.get("invoice", {})
+    issues = state_data.get("issues", [])
+    fixed_issues = state_data.get("fixed_issues", {})
     
     if not data:
         await c.message.answer("❌ Данные накладной отсутствуют. Попробуйте снова.")
@@ -455,15 +515,15 @@ async def cb_confirm_invoice(c: CallbackQuery, state: FSMContext):
             # Подготавливаем итоговое сообщение об успешном экспорте
             total_items = len(active_positions)
             
-            # Получаем актуальный список проблем (исключая исправленные)
-            fixed_indices = set(fixed_issues.keys() if fixed_issues else set())
-            remaining_issues = [
-                issue for issue in issues 
-                if issue.get("index") - 1 not in fixed_indices
-            ]
+            # Считаем оставшиеся проблемы (исключая исправленные) без построения
+            # промежуточного списка; у проблем поставщика нет номера позиции
+            fixed_indices = set(fixed_issues or ())
+            remaining_count = sum(
+                1 for issue in issues
+                if (issue.get("index") or 0) - 1 not in fixed_indices
+            )
             
-            fixed_count = len(fixed_issues) if fixed_issues else 0
-            remaining_count = len(remaining_issues)
+            fixed_count = len(fixed_indices)
             
             if remaining_count > 0:
                 msg = (
@@ -505,8 +565,9 @@ async def cb_confirm_invoice(c: CallbackQuery, state: FSMContext):
 async def cb_edit_invoice(c: CallbackQuery, state: FSMContext):
     """Обработчик для перехода к редактированию накладной."""
     # Получаем данные из состояния
-    data = (await state.get_data()).get("invoice", {})
-    issues = (await state.get_data()).get("issues", [])
+    state_data = await state.get_data()
+    data = state_data.get("invoice", {})
+    issues = state_data.get("issues", [])
     
     if not issues:
         await c.message.answer("✅ Нет позиций для исправления.")
@@ -530,15 +591,8 @@ async def cb_edit_invoice(c: CallbackQuery, state: FSMContext):
         original = issue.get("original", {})
         name = original.get("name", "")[:20]
         
-        # Выбираем иконку в зависимости от типа проблемы
-        if "Not in database" in issue.get("issue", ""):
-            icon = "⚠"
-        elif "incorrect match" in issue.get("issue", ""):
-            icon = "❔"
-        elif "Unit" in issue.get("issue", ""):
-            icon = "🔄"
-        else:
-            icon = "❓"
+        # Выбираем иконку по коду проблемы одним поиском в словаре
+        icon = ISSUE_ICONS.get(issue.get("type"), "❓")
         
         btn_text = f"{index}. {icon} {name}"
         keyboard.append([
@@ -1,12 +1,15 @@
 """Утилиты для работы с кэшем."""
 
-import json
-from typing import Any, Optional
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
 
-from app.core.constants import CACHE_PREFIX, CACHE_TTL
+from app.core.constants import CACHE_MAX_SIZE, CACHE_PREFIX, CACHE_TTL
 
-# Простой in-memory кэш
-_cache = {}
+# In-memory LRU-кэш: ключ -> (момент истечения по time.monotonic(), значение).
+# Функции модуля синхронные, поэтому в пределах event loop отдельная
+# блокировка не нужна
+_cache: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
 
 def get_cache_key(key: str) -> str:
     """Получает ключ кэша.
@@ -19,6 +22,25 @@ def get_cache_key(key: str) -> str:
     """
     return f"{CACHE_PREFIX}{key}"
 
+def _load(cache_key: str) -> Optional[Any]:
+    """Возвращает неистекшее значение по полному ключу и отмечает его как недавнее."""
+    entry = _cache.get(cache_key)
+    if entry is None:
+        return None
+    expires_at, value = entry
+    if expires_at <= time.monotonic():
+        del _cache[cache_key]
+        return None
+    _cache.move_to_end(cache_key)
+    return value
+
+def _store(cache_key: str, value: Any, ttl: Optional[int]) -> None:
+    """Сохраняет значение по полному ключу, вытесняя самые старые записи сверх лимита."""
+    _cache[cache_key] = (time.monotonic() + (ttl or CACHE_TTL), value)
+    _cache.move_to_end(cache_key)
+    while len(_cache) > CACHE_MAX_SIZE:
+        _cache.popitem(last=False)
+
 def get(key: str) -> Optional[Any]:
     """Получает значение из кэша.
 
@@ -28,10 +50,7 @@ def get(key: str) -> Optional[Any]:
     Returns:
         Optional[Any]: Значение или None
     """
-    cache_key = get_cache_key(key)
-    if cache_key in _cache:
-        return _cache[cache_key]
-    return None
+    return _load(get_cache_key(key))
 
 def set(key: str, value: Any, ttl: Optional[int] = None) -> None:
     """Устанавливает значение в кэш.
@@ -39,10 +58,9 @@ def set(key: str, value: Any, ttl: Optional[int] = None) -> None:
     Args:
         key: Ключ
         value: Значение
-        ttl: Время жизни в секундах
+        ttl: Время жизни в секундах (по умолчанию CACHE_TTL)
     """
-    cache_key = get_cache_key(key)
-    _cache[cache_key] = value
+    _store(get_cache_key(key), value, ttl)
 
 def delete(key: str) -> None:
     """Удаляет значение из кэша.
@@ -50,9 +68,7 @@ def delete(key: str) -> None:
     Args:
         key: Ключ
     """
-    cache_key = get_cache_key(key)
-    if cache_key in _cache:
-        del _cache[cache_key]
+    _cache.pop(get_cache_key(key), None)
 
 def clear() -> None:
     """Очищает кэш."""
@@ -68,7 +84,7 @@ def get_or_set(
     Args:
         key: Ключ
         default_func: Функция для получения значения по умолчанию
-        ttl: Время жизни в секундах
+        ttl: Время жизни в секундах (по умолчанию CACHE_TTL)
 
     Returns:
         Any: Значение
@@ -80,17 +96,19 @@ def get_or_set(
     return value
 
 def cache_json(key: str, value: Any) -> None:
-    """Кэширует значение в формате JSON.
+    """Кэширует JSON-совместимое значение.
+
+    Кэш находится в памяти процесса, поэтому значение хранится как есть,
+    без сериализации; возвращаемый get_json объект не копируется.
 
     Args:
         key: Ключ
         value: Значение
     """
-    cache_key = get_cache_key(key)
-    _cache[cache_key] = json.dumps(value)
+    _store(get_cache_key(key), value, None)
 
 def get_json(key: str) -> Optional[Any]:
-    """Получает значение из кэша в формате JSON.
+    """Получает JSON-совместимое значение из кэша.
 
     Args:
         key: Ключ
@@ -98,7 +116,4 @@ def get_json(key: str) -> Optional[Any]:
     Returns:
         Optional[Any]: Значение или None
     """
-    cache_key = get_cache_key(key)
-    if cache_key in _cache:
-        return json.loads(_cache[cache_key])
-    return None 
\ No newline at end of file
+    return _load(get_cache_key(key))
@@ -12,78 +12,67 @@ from typing import Any, Optional, Union
 
 logger = structlog.get_logger()
 
-async def log_change(
-    invoice_id: int, 
+def get_edit_logger(invoice_id: int, user_id: int) -> structlog.typing.FilteringBoundLogger:
+    """
+    Create a logger bound to one invoice editing session.
+    
+    Bind once per handler and pass the result to the log_* helpers, so the
+    invoice and user context is not rebuilt for every logged change.
+    
+    Args:
+        invoice_id: ID of the invoice being modified
+        user_id: Telegram user ID of the person making the changes
+        
+    Returns:
+        Logger with invoice_id and user_id bound
+    """
+    return logger.bind(invoice_id=invoice_id, user_id=user_id)
+
+def log_change(
+    elog: structlog.typing.FilteringBoundLogger,
     row_idx: int, 
-    user_id: int,
     field: str, 
     old: Any, 
     new: Any
-):
+) -> None:
     """
     Log a change to an invoice field.
     
     Args:
-        invoice_id: ID of the invoice being modified
+        elog: Logger from get_edit_logger for the invoice being modified
         row_idx: Index of the row in the invoice
-        user_id: Telegram user ID of the person making the change
         field: Field name that was changed (name, quantity, unit, price)
         old: Previous value
         new: New value
     """
-    logger.info(
-        "EDIT",
-        invoice_id=invoice_id, 
-        row_idx=row_idx, 
-        field=field, 
-        old=old, 
-        new=new, 
-        user_id=user_id,
-    )
+    elog.info("EDIT", row_idx=row_idx, field=field, old=old, new=new)
 
-async def log_delete(
-    invoice_id: int, 
+def log_delete(
+    elog: structlog.typing.FilteringBoundLogger,
     row_idx: int, 
-    user_id: int,
     item_name: str
-):
+) -> None:
     """
     Log a row deletion from an invoice.
     
     Args:
-        invoice_id: ID of the invoice being modified
+        elog: Logger from get_edit_logger for the invoice being modified
         row_idx: Index of the row in the invoice
-        user_id: Telegram user ID of the person making the change
         item_name: Name of the deleted item
     """
-    logger.info(
-        "DELETE",
-        invoice_id=invoice_id,
-        row_idx=row_idx,
-        item_name=item_name,
-        user_id=user_id,
-    )
-
-async def log_save_new(
-    invoice_id: int,
+    elog.info("DELETE", row_idx=row_idx, item_name=item_name)
 
+def log_save_new(
+    elog: structlog.typing.FilteringBoundLogger,
     row_idx: int, 
-    user_id: int,
     item_name: str
-):
+) -> None:
     """
     Log saving a row as a new product.
     
     Args:
-        invoice_id: ID of the invoice being modified
+        elog: Logger from get_edit_logger for the invoice being modified
         row_idx: Index of the row in the invoice
-        user_id: Telegram user ID of the person making the change
         item_name: Name of the item saved as new
     """
-    logger.info(
-        "SAVE_NEW",
-        invoice_id=invoice_id,
-        row_idx=row_idx,
-        item_name=item_name,
-        user_id=user_id,
-    )
+    elog.info("SAVE_NEW", row_idx=row_idx, item_name=item_name)
@@ -3,25 +3,33 @@
 Адаптирован для индонезийского рынка.
 """
 
+from calendar import monthrange
 from datetime import datetime, date, timedelta
 from typing import Optional, Union, List, Dict
-import pytz
+from zoneinfo import ZoneInfo
 import json
 from pathlib import Path
 
+# Формат даты ISO 8601, для которого есть быстрые пути без strptime/strftime
+ISO_DATE_FORMAT = "%Y-%m-%d"
+
+# Шаг в один день для обхода соседних дат
+_ONE_DAY = timedelta(days=1)
+
 # Загружаем индонезийские праздники
 HOLIDAYS_FILE = Path(__file__).parent.parent / "data" / "id_holidays.json"
 
-def load_holidays() -> Dict[str, str]:
-    """Загружает список индонезийских праздников."""
+def load_holidays() -> Dict[date, str]:
+    """Загружает список индонезийских праздников (ключи приводятся к date)."""
     try:
         with open(HOLIDAYS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
+            raw = json.load(f)
     except FileNotFoundError:
         return {}
+    return {date.fromisoformat(k): v for k, v in raw.items()}
 
 # Загружаем праздники при импорте модуля
-INDONESIAN_HOLIDAYS = load_holidays()
+INDONESIAN_HOLIDAYS: Dict[date, str] = load_holidays()
 
 def get_current_date() -> date:
     """Возвращает текущую дату."""
@@ -31,8 +39,22 @@ def get_current_datetime() -> datetime:
     """Возвращает текущую дату и время."""
     return datetime.now()
 
-def parse_date(date_str: str, format: str = "%Y-%m-%d") -> Optional[date]:
+def parse_date(date_str: str, format: str = ISO_DATE_FORMAT) -> Optional[date]:
     """Парсит строку в дату."""
+    # Быстрый путь для ISO-формата: date.fromisoformat не разбирает шаблон.
+    # Проверка длины и дефисов отсекает другие ISO-варианты (например,
+    # "2024-W12-3"), которые strptime с этим шаблоном не принял бы;
+    # остальное (в т.ч. даты без ведущих нулей) уходит в strptime
+    if (
+        format == ISO_DATE_FORMAT
+        and len(date_str) == 10
+        and date_str[4] == "-"
+        and date_str[7] == "-"
+    ):
+        try:
+            return date.fromisoformat(date_str)
+        except ValueError:
+            return None
     try:
         return datetime.strptime(date_str, format).date()
     except ValueError:
@@ -40,6 +62,10 @@ def parse_date(date_str: str, format: str = "%Y-%m-%d") -> Optional[date]:
 
 def format_date(d: date, format: str = "%d.%m.%Y") -> str:
     """Форматирует дату в строку."""
+    # isoformat совпадает со strftime для обычных дат (strftime не дополняет
+    # нулями годы меньше 1000, а у datetime isoformat добавляет время)
+    if format == ISO_DATE_FORMAT and type(d) is date and d.year >= 1000:
+        return d.isoformat()
     return d.strftime(format)
 
 def format_datetime(dt: datetime, format: str = "%d.%m.%Y %H:%M") -> str:
@@ -52,19 +78,19 @@ def add_days(d: date, days: int) -> date:
 
 def add_months(d: date, months: int) -> date:
     """Добавляет указанное количество месяцев к дате."""
-    year = d.year + (d.month + months - 1) // 12
-    month = (d.month + months - 1) % 12 + 1
-    day = min(d.day, [31, 29 if year % 4 == 0 and (year % 100 != 0 or year % 400 == 0) else 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31][month - 1])
-    return date(year, month, day)
+    total = d.month - 1 + months
+    year = d.year + total // 12
+    month = total % 12 + 1
+    # Число дней в месяце (с учетом високосных лет) берем из calendar
+    return date(year, month, min(d.day, monthrange(year, month)[1]))
 
 def get_date_range(start_date: date, end_date: date) -> List[date]:
     """Возвращает список дат в указанном диапазоне."""
-    dates = []
-    current_date = start_date
-    while current_date <= end_date:
-        dates.append(current_date)
-        current_date = add_days(current_date, 1)
-    return dates
+    # Один проход по порядковым номерам дней вместо цикла с add_days
+    return [
+        date.fromordinal(o)
+        for o in range(start_date.toordinal(), end_date.toordinal() + 1)
+    ]
 
 def is_weekend(d: date) -> bool:
     """Проверяет, является ли дата выходным днем."""
@@ -72,51 +98,58 @@ def is_weekend(d: date) -> bool:
 
 def is_holiday(d: date) -> bool:
     """Проверяет, является ли дата индонезийским праздником."""
-    date_str = d.strftime("%Y-%m-%d")
-    return date_str in INDONESIAN_HOLIDAYS
+    return d in INDONESIAN_HOLIDAYS
 
 def get_holiday_name(d: date) -> Optional[str]:
     """Возвращает название индонезийского праздника, если дата является праздником."""
-    date_str = d.strftime("%Y-%m-%d")
-    return INDONESIAN_HOLIDAYS.get(date_str)
+    return INDONESIAN_HOLIDAYS.get(d)
 
 def is_workday(d: date) -> bool:
     """Проверяет, является ли дата рабочим днем."""
-    return not (is_weekend(d) or is_holiday(d))
+    # Проверки is_weekend/is_holiday встроены: функция вызывается в циклах
+    return d.weekday() < 5 and d not in INDONESIAN_HOLIDAYS
 
 def get_next_workday(d: date) -> date:
     """Возвращает следующий рабочий день."""
-    next_day = add_days(d, 1)
+    next_day = d + _ONE_DAY
     while not is_workday(next_day):
-        next_day = add_days(next_day, 1)
+        next_day += _ONE_DAY
     return next_day
 
 def get_previous_workday(d: date) -> date:
     """Возвращает предыдущий рабочий день."""
-    prev_day = add_days(d, -1)
+    prev_day = d - _ONE_DAY
     while not is_workday(prev_day):
-        prev_day = add_days(prev_day, -1)
+        prev_day -= _ONE_DAY
     return prev_day
 
 def convert_timezone(dt: datetime, from_tz: str, to_tz: str) -> datetime:
-    """Конвертирует время между часовыми поясами."""
-    from_zone = pytz.timezone(from_tz)
-    to_zone = pytz.timezone(to_tz)
+    """Конвертирует время между часовыми поясами.
     
-    # Локализуем время в исходной временной зоне
-    localized_dt = from_zone.localize(dt)
+    from_tz применяется только к наивному времени: у времени с часовым
+    поясом учитывается его собственный пояс.
+    """
+    # ZoneInfo сам кэширует объекты зон по имени, поэтому повторные вызовы
+    # не перечитывают базу часовых поясов
+    if dt.tzinfo is not None:
+        return dt.astimezone(ZoneInfo(to_tz))
+    localized_dt = dt.replace(tzinfo=ZoneInfo(from_tz))
     
     # Конвертируем в целевую временную зону
-    return localized_dt.astimezone(to_zone)
+    return localized_dt.astimezone(ZoneInfo(to_tz))
 
 def get_workdays_in_range(start_date: date, end_date: date) -> List[date]:
     """Возвращает список рабочих дней в указанном диапазоне."""
-    return [d for d in get_date_range(start_date, end_date) if is_workday(d)]
+    return [
+        d for d in get_date_range(start_date, end_date)
+        if d.weekday() < 5 and d not in INDONESIAN_HOLIDAYS
+    ]
 
 def get_holidays_in_range(start_date: date, end_date: date) -> Dict[date, str]:
     """Возвращает словарь праздников в указанном диапазоне."""
-    holidays = {}
-    for d in get_date_range(start_date, end_date):
-        if is_holiday(d):
-            holidays[d] = get_holiday_name(d)
-    return holidays 
\ No newline at end of file
+    # Праздников заметно меньше, чем дней в длинном диапазоне: перебираем их
+    return {
+        d: name
+        for d, name in sorted(INDONESIAN_HOLIDAYS.items())
+        if start_date <= d <= end_date
+    } 
\ No newline at end of file
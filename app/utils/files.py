@@ -1,10 +1,11 @@
 """Утилиты для работы с файлами."""
 
 import os
+import secrets
 import shutil
-from datetime import datetime
+import time
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import List, Optional, Tuple, Union
 
 from app.core.constants import (
     ALLOWED_EXTENSIONS,
@@ -64,9 +65,11 @@ def get_unique_filename(filename: str) -> str:
     Returns:
         str: Уникальное имя файла
     """
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    # Метка времени оставляет имена сортируемыми, а случайный суффикс
+    # исключает совпадения у файлов, сохраненных в одну и ту же секунду
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
     name, ext = os.path.splitext(filename)
-    return f"{name}_{timestamp}{ext}"
+    return f"{name}_{timestamp}_{secrets.token_hex(4)}{ext}"
 
 def save_file(
     file_path: str,
@@ -97,7 +100,9 @@ def save_file(
         unique_filename = get_unique_filename(filename)
         destination = destination or str(upload_dir / unique_filename)
 
-        shutil.copy2(file_path, destination)
+        # copyfile копирует только содержимое и на Linux использует sendfile
+        # внутри ядра; метаданные (как в copy2) для загрузок не нужны
+        shutil.copyfile(file_path, destination)
         return True, destination
 
     except Exception as e:
@@ -124,13 +129,13 @@ def delete_file(file_path: str) -> Tuple[bool, str]:
 
 def list_files(
     directory: Optional[str] = None,
-    pattern: Optional[str] = None
+    pattern: Optional[Union[str, Tuple[str, ...]]] = None
 ) -> List[str]:
     """Получает список файлов.
 
     Args:
         directory: Директория
-        pattern: Шаблон поиска
+        pattern: Окончание имени файла или кортеж допустимых окончаний
 
     Returns:
         List[str]: Список файлов
@@ -139,11 +144,10 @@ def list_files(
     if not os.path.exists(directory):
         return []
 
-    files = []
-    for filename in os.listdir(directory):
-        if pattern and not filename.endswith(pattern):
-            continue
-        if os.path.isfile(os.path.join(directory, filename)):
-            files.append(filename)
-
-    return files 
\ No newline at end of file
+    # scandir отдает тип записи вместе с именем, поэтому is_file обычно
+    # не требует отдельного stat для каждого файла
+    with os.scandir(directory) as entries:
+        return [
+            entry.name for entry in entries
+            if (not pattern or entry.name.endswith(pattern)) and entry.is_file()
+        ] 
\ No newline at end of file
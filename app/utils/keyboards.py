@@ -11,6 +11,8 @@ from typing import List, Dict, Any, Optional
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.filters.callback_data import CallbackData
 
+from app.core.constants import ISSUE_ICONS
+
 
 # ────────────────────── Callback Data Classes ──────────────────────
 
@@ -24,6 +26,43 @@ class IssueCallback(CallbackData, prefix="issue"):
     action: str  # edit, save_new, delete, review_back
 
 
+# ────────────────────── Static Keyboards ──────────────────────
+# These keyboards don't depend on arguments, so callback data is packed and
+# the markup is built once at import; the builders below return the shared
+# instances.
+
+_CB_ISSUE_EDIT = IssueCallback(action="edit").pack()
+_CB_ISSUE_SAVE_NEW = IssueCallback(action="save_new").pack()
+_CB_ISSUE_DELETE = IssueCallback(action="delete").pack()
+_CB_ISSUE_REVIEW_BACK = IssueCallback(action="review_back").pack()
+
+KB_ISSUE_ACTIONS = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="✏️ Edit", callback_data=_CB_ISSUE_EDIT)],
+    [InlineKeyboardButton(text="📥 Save as new", callback_data=_CB_ISSUE_SAVE_NEW)],
+    [InlineKeyboardButton(text="❌ Delete row", callback_data=_CB_ISSUE_DELETE)],
+    [InlineKeyboardButton(text="↩️ Back to issues", callback_data=_CB_ISSUE_REVIEW_BACK)]
+])
+
+KB_FIELD_SELECTOR = InlineKeyboardMarkup(inline_keyboard=[
+    [
+        InlineKeyboardButton(text="✏️ Name", callback_data=FieldCallback(action="name").pack()),
+        InlineKeyboardButton(text="123 Qty", callback_data=FieldCallback(action="qty").pack())
+    ],
+    [
+        InlineKeyboardButton(text="⚖️ Unit", callback_data=FieldCallback(action="unit").pack()),
+        InlineKeyboardButton(text="💲 Price", callback_data=FieldCallback(action="price").pack())
+    ],
+    [InlineKeyboardButton(text="🔄 Reset changes", callback_data=FieldCallback(action="reset").pack())],
+    [InlineKeyboardButton(text="↩️ Cancel", callback_data=_CB_ISSUE_REVIEW_BACK)]
+])
+
+KB_AFTER_EDIT = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="✅ Save", callback_data=FieldCallback(action="save").pack())],
+    [InlineKeyboardButton(text="✏️ Edit more", callback_data=_CB_ISSUE_EDIT)],
+    [InlineKeyboardButton(text="↩️ Back", callback_data=_CB_ISSUE_REVIEW_BACK)]
+])
+
+
 # ────────────────────── Keyboard Builders ──────────────────────
 
 def kb_issue_actions() -> InlineKeyboardMarkup:
@@ -33,12 +72,7 @@ def kb_issue_actions() -> InlineKeyboardMarkup:
     Returns:
         InlineKeyboardMarkup: Keyboard with edit, save as new, delete and back buttons
     """
-    return InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="✏️ Edit", callback_data=IssueCallback(action="edit").pack())],
-        [InlineKeyboardButton(text="📥 Save as new", callback_data=IssueCallback(action="save_new").pack())],
-        [InlineKeyboardButton(text="❌ Delete row", callback_data=IssueCallback(action="delete").pack())],
-        [InlineKeyboardButton(text="↩️ Back to issues", callback_data=IssueCallback(action="review_back").pack())]
-    ])
+    return KB_ISSUE_ACTIONS
 
 
 def kb_field_selector() -> InlineKeyboardMarkup:
@@ -48,18 +82,7 @@ def kb_field_selector() -> InlineKeyboardMarkup:
     Returns:
         InlineKeyboardMarkup: Keyboard with field selection options
     """
-    return InlineKeyboardMarkup(inline_keyboard=[
-        [
-            InlineKeyboardButton(text="✏️ Name", callback_data=FieldCallback(action="name").pack()),
-            InlineKeyboardButton(text="123 Qty", callback_data=FieldCallback(action="qty").pack())
-        ],
-        [
-            InlineKeyboardButton(text="⚖️ Unit", callback_data=FieldCallback(action="unit").pack()),
-            InlineKeyboardButton(text="💲 Price", callback_data=FieldCallback(action="price").pack())
-        ],
-        [InlineKeyboardButton(text="🔄 Reset changes", callback_data=FieldCallback(action="reset").pack())],
-        [InlineKeyboardButton(text="↩️ Cancel", callback_data=IssueCallback(action="review_back").pack())]
-    ])
+    return KB_FIELD_SELECTOR
 
 
 def kb_after_edit() -> InlineKeyboardMarkup:
@@ -69,26 +92,42 @@ def kb_after_edit() -> InlineKeyboardMarkup:
     Returns:
         InlineKeyboardMarkup: Keyboard with save, edit more, back buttons
     """
-    return InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="✅ Save", callback_data=FieldCallback(action="save").pack())],
-        [InlineKeyboardButton(text="✏️ Edit more", callback_data=IssueCallback(action="edit").pack())],
-        [InlineKeyboardButton(text="↩️ Back", callback_data=IssueCallback(action="review_back").pack())]
-    ])
+    return KB_AFTER_EDIT
+
+
+# Fallback for legacy issues that carry only a free-text "issue" description
+_ICON_BY_PHRASE = (
+    ("Not in database", "⚠"),
+    ("incorrect match", "❔"),
+    ("Unit", "🔄"),
+)
+
+
+def _issue_icon(issue: Dict[str, Any]) -> str:
+    """Pick an icon by the issue type code, falling back to legacy description phrases."""
+    icon = ISSUE_ICONS.get(issue.get("type"))
+    if icon:
+        return icon
+    description = issue.get("issue", "")
+    for phrase, icon in _ICON_BY_PHRASE:
+        if phrase in description:
+            return icon
+    return "❓"
 
 
 # Legacy compatibility functions
 def kb_legacy_issue_list(issues: List[Dict[str, Any]], fixed_issues: Dict[int, Dict[str, Any]], page: int = 0) -> InlineKeyboardMarkup:
     """Legacy-compatible function for issue list keyboard with edited indicators."""
     page_size = 5
-    total_pages = math.ceil(len(issues) / page_size)
+    # Integer ceil division
+    total_pages = -(-len(issues) // page_size)
     page = max(0, min(page, total_pages - 1))
     
     buttons = []
     
     # Get issues for current page
     start_idx = page * page_size
-    end_idx = min(start_idx + page_size, len(issues))
-    current_issues = issues[start_idx:end_idx]
+    current_issues = issues[start_idx:start_idx + page_size]
     
     # Add buttons for each issue, marking edited ones
     for issue in current_issues:
@@ -100,19 +139,8 @@ def kb_legacy_issue_list(issues: List[Dict[str, Any]], fixed_issues: Dict[int, D
         # Check if this issue has been fixed
         is_fixed = position_idx in fixed_issues
         
-        issue_type = issue.get("issue", "")
-        
         # Choose icon based on issue type and fixed status
-        if is_fixed:
-            icon = "📝"  # Mark as edited
-        elif "Not in database" in issue_type:
-            icon = "⚠"
-        elif "incorrect match" in issue_type:
-            icon = "❔"
-        elif "Unit" in issue_type:
-            icon = "🔄"
-        else:
-            icon = "❓"
+        icon = "📝" if is_fixed else _issue_icon(issue)  # 📝 marks edited rows
             
         btn_text = f"{index}. {icon} {name}"
         buttons.append([
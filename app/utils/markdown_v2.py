@@ -5,12 +5,13 @@
 в формате Markdown V2 для Telegram Bot API.
 """
 from __future__ import annotations
-import re
-from typing import Optional
 
 # Специальные символы, которые нужно экранировать в Markdown V2
 _MD_V2_SPECIAL = r'_*[]()~`>#+-=|{}.!'
 
+# Таблица экранирования для str.translate, строится один раз при импорте
+_MD_V2_ESCAPE_TABLE = str.maketrans({char: "\\" + char for char in _MD_V2_SPECIAL})
+
 def md2_escape(text: str | None) -> str:
     """
     Экранирует специальные символы Markdown V2.
@@ -33,7 +34,7 @@ def md2_escape(text: str | None) -> str:
         return "—"
     
     text = str(text)
-    return re.sub(rf'([{re.escape(_MD_V2_SPECIAL)}])', r'\\\1', text)
+    return text.translate(_MD_V2_ESCAPE_TABLE)
 
 def format_bold(text: str) -> str:
     """Форматирует текст жирным шрифтом."""
@@ -6,12 +6,11 @@
 """
 from __future__ import annotations
 
-import re
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List
 from datetime import datetime
 
 import structlog
-from .markdown_v2 import md2_escape, format_list_item
+from .markdown_v2 import md2_escape
 
 logger = structlog.get_logger()
 
@@ -24,6 +23,9 @@ STATUS_EMOJIS = {
     "other": "❓"
 }
 
+# Максимальная длина одного сообщения (лимит Telegram — 4096 символов)
+MAX_MESSAGE_LENGTH = 4000
+
 # Специальные символы Markdown V2
 _MD_V2_SPECIAL = r'_*[]()~`>#+-=|{}.!'
 
@@ -129,8 +131,9 @@ def get_status_emoji(issues: List[Dict[str, Any]]) -> str:
     if not issues:
         return STATUS_EMOJIS["ok"]
     
-    # Определяем тип проблемы с наивысшим приоритетом
-    issue_types = [issue.get("type", "unknown_issue") for issue in issues]
+    # Определяем тип проблемы с наивысшим приоритетом: типы собираем
+    # в множество за один проход, дальше проверки — поиск в множестве
+    issue_types = {issue.get("type", "unknown_issue") for issue in issues}
     
     if "product_not_found" in issue_types:
         return STATUS_EMOJIS["not_found"]
@@ -161,11 +164,13 @@ def format_position(pos: Dict[str, Any], idx: int, issues: List[Dict[str, Any]])
     
     status = get_status_emoji(issues)
     
-    return format_list_item(idx, f"{status} {name}") + f"\n     {qty} {unit} × {price} = {total}"
+    # Название уже экранировано выше: format_list_item экранировал бы его повторно,
+    # и Telegram отклонил бы сообщение из-за лишних обратных слешей
+    return f"{idx}\\. {status} {name}\n     {qty} {unit} × {price} = {total}"
 
-def build_message(data: Dict[str, Any], issues: List[Dict[str, Any]]) -> str:
+def _compose_message(data: Dict[str, Any], issues: List[Dict[str, Any]]) -> str:
     """
-    Строит полное сообщение о накладной.
+    Собирает полный текст сообщения о накладной без ограничения длины.
     
     Args:
         data: Данные накладной
@@ -175,7 +180,7 @@ def build_message(data: Dict[str, Any], issues: List[Dict[str, Any]]) -> str:
         str: Отформатированное сообщение
     """
     # Если нет позиций, возвращаем специальное сообщение
-    positions = data.get("positions", [])
+    positions = data.get("positions") or []
     if not positions:
         return "😕 Не удалось распознать ни одной позиции…"
     
@@ -184,59 +189,118 @@ def build_message(data: Dict[str, Any], issues: List[Dict[str, Any]]) -> str:
     date = format_date(data.get("date", ""))
     invoice_no = md2_escape(data.get("number", ""))
     
-    header = f"📑 {supplier} • {date}"
+    header_parts = [f"📑 {supplier}", date]
     if invoice_no:
-        header += f" • № {invoice_no}"
+        header_parts.append(f"№ {invoice_no}")
+    header = " • ".join(header_parts)
+    
+    # Группируем проблемы по номеру позиции за один проход
+    issues_by_index: Dict[int, List[Dict[str, Any]]] = {}
+    for issue in issues:
+        issues_by_index.setdefault(issue.get("index"), []).append(issue)
     
-    # Считаем статистику
-    ok_positions = len([p for p in positions if not any(
-        i for i in issues if i.get("index") == positions.index(p) + 1
-    )])
+    # Форматируем позиции и одновременно считаем статистику
+    formatted_positions = []
+    ok_positions = 0
+    for i, pos in enumerate(positions, 1):
+        pos_issues = issues_by_index.get(i, [])
+        if not pos_issues:
+            ok_positions += 1
+        formatted_positions.append(format_position(pos, i, pos_issues))
     warn_positions = len(positions) - ok_positions
     
     stats = f"✅ {ok_positions} позиций подтверждено"
     if warn_positions > 0:
         stats += f" • ⚠️ {warn_positions} требует внимания"
     
-    # Форматируем позиции
-    formatted_positions = []
-    for i, pos in enumerate(positions, 1):
-        pos_issues = [
-            issue for issue in issues 
-            if issue.get("index") == i
-        ]
-        formatted_positions.append(format_position(pos, i, pos_issues))
-    
-    # Собираем части сообщения
-    message_parts = []
-    message_parts.append(header)
-    message_parts.append(stats)
-    message_parts.extend(formatted_positions)
+    # Собираем блоки тела сообщения: статистика, позиции, комментарий парсера
+    body_parts = [stats]
+    body_parts.extend(formatted_positions)
     
     # Добавляем комментарий парсера, если есть
     parser_comment = data.get("parser_comment", "").strip()
     if parser_comment:
-        message_parts.append(f"ℹ️ {md2_escape(parser_comment)}")
+        body_parts.append(f"ℹ️ {md2_escape(parser_comment)}")
     
-    # Собираем сообщение с правильными отступами
-    message = header + "\n"  # Заголовок
-    message += stats  # Статистика
-    
-    # Добавляем позиции с отступами
-    if formatted_positions:
-        message += "\n\n" + "\n\n".join(formatted_positions)
+    # Собираем сообщение одним join: заголовок, затем блоки через пустую строку
+    return header + "\n" + "\n\n".join(body_parts)
+
+def build_message(data: Dict[str, Any], issues: List[Dict[str, Any]]) -> str:
+    """
+    Строит полное сообщение о накладной, обрезая его до MAX_MESSAGE_LENGTH.
     
-    # Добавляем комментарий с отступом
-    if parser_comment:
-        message += "\n\nℹ️ " + md2_escape(parser_comment)
+    Args:
+        data: Данные накладной
+        issues: Список проблем
+        
+    Returns:
+        str: Отформатированное сообщение
+    """
+    message = _compose_message(data, issues)
     
     # Проверяем длину сообщения и обрезаем при необходимости
-    if len(message) > 4000:
+    if len(message) > MAX_MESSAGE_LENGTH:
         # Находим последний полный абзац
-        parts = message[:4000].split("\n\n")
+        parts = message[:MAX_MESSAGE_LENGTH].split("\n\n")
         message = "\n\n".join(parts[:-1])
         
         # Добавляем многоточие как обычный текст
         message += "\n\n..."
     
-    return message 
\ No newline at end of file
+    return message
+
+def build_message_parts(data: Dict[str, Any], issues: List[Dict[str, Any]]) -> List[str]:
+    """
+    Строит сообщение о накладной целиком, разбивая его на части,
+    каждая из которых укладывается в лимит Telegram.
+    
+    Args:
+        data: Данные накладной
+        issues: Список проблем
+        
+    Returns:
+        List[str]: Части сообщения для отправки по порядку
+    """
+    return split_message(_compose_message(data, issues))
+
+def _split_long_paragraph(paragraph: str, limit: int) -> List[str]:
+    """Делит абзац длиннее limit по строкам, а при необходимости — по символам."""
+    pieces = []
+    while len(paragraph) > limit:
+        cut = paragraph.rfind("\n", 0, limit)
+        if cut <= 0:
+            cut = limit
+            # Не разрываем экранирующую последовательность вида "\."
+            if paragraph[cut - 1] == "\\":
+                cut -= 1
+        pieces.append(paragraph[:cut])
+        paragraph = paragraph[cut:].lstrip("\n")
+    pieces.append(paragraph)
+    return pieces
+
+def split_message(message: str, limit: int = MAX_MESSAGE_LENGTH) -> List[str]:
+    """
+    Разбивает сообщение на части не длиннее limit по границам абзацев.
+    
+    Args:
+        message: Текст сообщения
+        limit: Максимальная длина одной части
+        
+    Returns:
+        List[str]: Части сообщения (одна, если сообщение укладывается в лимит)
+    """
+    if len(message) <= limit:
+        return [message]
+    
+    chunks = []
+    current = ""
+    for paragraph in message.split("\n\n"):
+        for piece in _split_long_paragraph(paragraph, limit):
+            if current and len(current) + 2 + len(piece) > limit:
+                chunks.append(current)
+                current = piece
+            else:
+                current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
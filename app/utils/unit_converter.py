@@ -11,10 +11,13 @@ Example:
     >>> convert(1000, "ml", "l")  # Returns 1.0
 """
 
-from typing import Dict, Tuple, Optional, Set
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Tuple, Optional, FrozenSet, Mapping
 
-# Unit normalization dictionary
-UNIT_ALIASES: Dict[str, str] = {
+# Unit normalization dictionary (read-only: normalize_unit results are memoized,
+# so mutating the table at runtime would leave stale cached entries)
+UNIT_ALIASES: Mapping[str, str] = MappingProxyType({
     # English volume units
     "l": "l", "ltr": "l", "liter": "l", "liters": "l", "litre": "l", "litres": "l",
     "ml": "ml", "milliliter": "ml", "milliliters": "ml", "millilitre": "ml", "millilitres": "ml",
@@ -28,41 +31,60 @@ UNIT_ALIASES: Dict[str, str] = {
     "pack": "pack", "package": "pack", "pkg": "pack",
     "box": "box", "boxes": "box",
     
-    # Indonesian volume units
-    "liter": "l", "lt": "l",
+    # Indonesian volume units ("liter" is shared with English)
+    "lt": "l",
     "mililiter": "ml", "mili": "ml",
     
-    # Indonesian weight units
-    "kilogram": "kg", "kilo": "kg",
-    "gram": "g",
+    # Indonesian weight units: "kilogram", "kilo", "gram" are shared with English
     
     # Indonesian countable units
-    "buah": "pcs", "biji": "pcs", "pcs": "pcs", "potong": "pcs",
+    "buah": "pcs", "biji": "pcs", "potong": "pcs",
     "paket": "pack", "pak": "pack",
     "kotak": "box", "dus": "box", "kardus": "box",
     
     # Common abbreviations
     "ea": "pcs",  # each
     "btl": "pcs",  # bottle/botol
+})
+
+# Size of each convertible unit in its category's base unit
+# (a new metric unit needs only one entry here)
+BASE_UNIT_SIZES: Dict[str, Tuple[str, float]] = {
+    "l": ("l", 1.0), "ml": ("l", 0.001),
+    "kg": ("kg", 1.0), "g": ("kg", 0.001),
 }
 
-# Conversion factors between units
+# Conversion factors between units, precomputed for every pair sharing a base unit
 CONVERSION_FACTORS: Dict[Tuple[str, str], float] = {
-    ("ml", "l"): 0.001,
-    ("l", "ml"): 1000,
-    ("g", "kg"): 0.001,
-    ("kg", "g"): 1000,
+    (from_unit, to_unit): round(from_size / to_size, 12)
+    for from_unit, (from_base, from_size) in BASE_UNIT_SIZES.items()
+    for to_unit, (to_base, to_size) in BASE_UNIT_SIZES.items()
+    if from_unit != to_unit and from_base == to_base
 }
 
 # Unit categories for compatibility checking
-VOLUME_UNITS: Set[str] = {"l", "ml"}
-WEIGHT_UNITS: Set[str] = {"kg", "g"}
-COUNTABLE_UNITS: Set[str] = {"pcs", "pack", "box"}
+VOLUME_UNITS: FrozenSet[str] = frozenset({"l", "ml"})
+WEIGHT_UNITS: FrozenSet[str] = frozenset({"kg", "g"})
+COUNTABLE_UNITS: FrozenSet[str] = frozenset({"pcs", "pack", "box"})
+
+# Unit -> category lookup, built once from the category sets above
+UNIT_CATEGORIES: Dict[str, str] = {
+    **{unit: "volume" for unit in VOLUME_UNITS},
+    **{unit: "weight" for unit in WEIGHT_UNITS},
+    **{unit: "countable" for unit in COUNTABLE_UNITS},
+}
+
+# Canonical unit names that normalize_unit returns unchanged
+CANONICAL_UNITS: FrozenSet[str] = frozenset(UNIT_ALIASES.values())
 
 def normalize_unit(unit_str: str) -> str:
     """
     Normalize unit string to standard format.
     
+    Units that are already canonical are returned as is; other strings
+    are normalized once and memoized, since the set of distinct unit
+    strings seen in invoices is small.
+    
     Args:
         unit_str: Input unit string to normalize
         
@@ -75,6 +97,14 @@ def normalize_unit(unit_str: str) -> str:
         >>> normalize_unit("KILOGRAM")
         'kg'
     """
+    # Fast path: most invoices already use canonical units
+    if unit_str in CANONICAL_UNITS:
+        return unit_str
+    return _normalize_unit_cached(unit_str)
+
+@lru_cache(maxsize=512)
+def _normalize_unit_cached(unit_str: str) -> str:
+    """Lowercase, strip and resolve aliases for a non-canonical unit string."""
     if not unit_str:
         return ""
     
@@ -131,25 +161,29 @@ def is_compatible_unit(unit1: str, unit2: str) -> bool:
         >>> is_compatible_unit("kg", "pcs")
         False
     """
-    unit1 = normalize_unit(unit1)
-    unit2 = normalize_unit(unit2)
+    return is_compatible_normalized(normalize_unit(unit1), normalize_unit(unit2))
+
+def is_compatible_normalized(unit1: str, unit2: str) -> bool:
+    """
+    Check compatibility of two units that are already normalized.
     
+    Same as is_compatible_unit, but skips normalize_unit for callers that
+    normalize once up front (e.g. catalog units normalized at load time).
+    
+    Args:
+        unit1: First normalized unit
+        unit2: Second normalized unit
+        
+    Returns:
+        True if units are compatible, False otherwise
+    """
     # Same normalized units are always compatible
     if unit1 == unit2:
         return True
     
-    # Check if there's a direct conversion factor
-    if (unit1, unit2) in CONVERSION_FACTORS or (unit2, unit1) in CONVERSION_FACTORS:
-        return True
-    
-    # Check unit categories
-    if unit1 in VOLUME_UNITS and unit2 in VOLUME_UNITS:
-        return True
-    if unit1 in WEIGHT_UNITS and unit2 in WEIGHT_UNITS:
-        return True
-    if unit1 in COUNTABLE_UNITS and unit2 in COUNTABLE_UNITS:
-        # Countable units technically aren't directly convertible without 
-        # additional knowledge (e.g., how many pieces in a pack)
-        return False
-    
-    return False 
\ No newline at end of file
+    # Check unit categories; every pair in CONVERSION_FACTORS shares a
+    # category, so no separate probe is needed. Countable units technically
+    # aren't directly convertible without additional knowledge (e.g., how
+    # many pieces in a pack)
+    category = UNIT_CATEGORIES.get(unit1)
+    return category is not None and category != "countable" and category == UNIT_CATEGORIES.get(unit2)
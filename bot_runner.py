@@ -29,6 +29,7 @@ from aiogram.fsm.storage.memory import MemoryStorage
 from app.config.settings import get_settings
 from app.routers.telegram_bot import router as main_router
 from app.routers.issue_editor import router as editor_router
+from app.routers.gpt_combined import close_http_client
 
 # ───────────────────────  Логирование  ──────────────────────────
 #
@@ -76,6 +77,7 @@ async def main() -> None:
     finally:
         # Закрываем сессию бота при выходе
         await bot.session.close()
+        await close_http_client()
     
     logger.info("✅ Polling finished (graceful shutdown)")
 
@@ -0,0 +1,58 @@
+"""
+Тесты для модуля cache.py
+"""
+
+import pytest
+from app.utils import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Очищаем кэш перед каждым тестом."""
+    cache.clear()
+    yield
+    cache.clear()
+
+def test_set_and_get():
+    """Тест сохранения и получения значения."""
+    cache.set("key", {"a": 1})
+    assert cache.get("key") == {"a": 1}
+    assert cache.get("missing") is None
+
+def test_ttl_expiry(monkeypatch):
+    """Тест истечения времени жизни значения."""
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+
+    cache.set("key", "value", ttl=10)
+    now[0] += 5
+    assert cache.get("key") == "value"
+    now[0] += 10
+    assert cache.get("key") is None
+
+def test_lru_eviction(monkeypatch):
+    """Тест вытеснения давно неиспользованных значений сверх лимита."""
+    monkeypatch.setattr(cache, "CACHE_MAX_SIZE", 2)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+def test_get_or_set_and_delete():
+    """Тест get_or_set и удаления значения."""
+    assert cache.get_or_set("key", lambda: 42) == 42
+    assert cache.get_or_set("key", lambda: 0) == 42
+    cache.delete("key")
+    cache.delete("key")
+    assert cache.get("key") is None
+
+def test_json_roundtrip():
+    """Тест кэширования значений в JSON."""
+    cache.cache_json("key", {"items": [1, 2]})
+    assert cache.get_json("key") == {"items": [1, 2]}
+    assert cache.get_json("missing") is None
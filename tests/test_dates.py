@@ -3,7 +3,7 @@
 """
 
 import pytest
-from datetime import datetime, date, timedelta
+from datetime import datetime, date, timedelta, timezone
 from app.utils.dates import (
     get_current_date,
     get_current_datetime,
@@ -157,6 +157,15 @@ def test_convert_timezone():
     back_to_utc = convert_timezone(jakarta_time, "Asia/Jakarta", "UTC")
     assert back_to_utc.hour == 12
 
+def test_convert_timezone_aware_keeps_own_zone():
+    """Тест конвертации времени, у которого уже указан часовой пояс."""
+    utc_time = datetime(2024, 3, 20, 12, 0, tzinfo=timezone.utc)
+    
+    # Пояс исходного времени важнее from_tz
+    jakarta_time = convert_timezone(utc_time, "Asia/Makassar", "Asia/Jakarta")
+    assert jakarta_time.hour == 19
+    assert jakarta_time == utc_time
+
 def test_get_workdays_in_range():
     """Тест получения списка рабочих дней в диапазоне."""
     start_date = date(2024, 3, 18)  # Понедельник
@@ -3,7 +3,11 @@
 """
 
 import pytest
-from app.routers.fuzzy_match import fuzzy_match_product, find_similar_products
+from app.routers.fuzzy_match import (
+    fuzzy_match_product,
+    fuzzy_match_products,
+    find_similar_products
+)
 from app.core.data_loader import load_data
 
 
@@ -46,3 +50,44 @@ async def test_find_similar_products():
     assert len(products) > 0, "Should find at least one similar product"
     assert all(isinstance(p["confidence"], float) for p in products), "All products should have confidence score"
     assert all(p["confidence"] > 0.7 for p in products), "All products should have confidence > 0.7"
+
+@pytest.mark.asyncio
+async def test_fuzzy_match_products_batch():
+    """Проверяем пакетное сопоставление: порядок результатов и пустые названия."""
+    results = await fuzzy_match_products(["service", "", "TAX"])
+    
+    assert len(results) == 3, "Should return one result per name"
+    assert results[0][0] is not None and results[0][1] == 1.0, "Exact match should have confidence 1.0"
+    assert results[1] == (None, 0.0), "Empty name should not be matched"
+    assert results[2][0] is not None, "Exact match should be found"
+    assert results[0][0] != results[2][0], "Different names should map to different products"
+
+@pytest.mark.asyncio
+async def test_fuzzy_match_products_empty():
+    """Проверяем пакетное сопоставление пустого списка."""
+    assert await fuzzy_match_products([]) == []
+
+@pytest.mark.asyncio
+async def test_fuzzy_match_products_duplicates():
+    """Проверяем, что повторяющиеся названия получают одинаковый результат."""
+    results = await fuzzy_match_products(["Tomat", "service", "Tomat"])
+    
+    assert len(results) == 3, "Should return one result per name, including repeats"
+    assert results[0] == results[2], "Repeated names should share the same match"
+
+@pytest.mark.asyncio
+async def test_fuzzy_match_products_normalized_exact():
+    """Проверяем, что регистр и лишние пробелы не мешают точному совпадению."""
+    results = await fuzzy_match_products(["Almond milk iced", "ALMOND   milk  ICED"])
+    
+    assert results[0][1] == 1.0, "Exact match should have confidence 1.0"
+    assert results[1] == results[0], "Case and extra spaces should be ignored"
+
+@pytest.mark.asyncio
+async def test_fuzzy_match_products_cache_reset_on_reload():
+    """Проверяем, что повторный запрос берется из кеша, а перезагрузка каталога сбрасывает кеш."""
+    first = await fuzzy_match_products(["Rasp"])
+    assert await fuzzy_match_products(["Rasp"]) == first, "Cached result should match the computed one"
+    
+    load_data()
+    assert await fuzzy_match_products(["Rasp"]) == first, "Result after reload should be recomputed identically"
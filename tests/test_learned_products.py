@@ -0,0 +1,129 @@
+"""
+Тесты сохранения сопоставлений товаров в learned_products.csv.
+"""
+import pathlib
+
+import pandas as pd
+import pytest
+
+from app.routers.issue_editor import utils
+
+PRODUCTS = {
+    "p1": {"id": "p1", "name": "Raspberry"},
+    "p2": {"id": "p2", "name": "Apple"},
+}
+
+
+@pytest.fixture
+def csv_path(tmp_path: pathlib.Path, monkeypatch) -> pathlib.Path:
+    """Переключает сохранение во временную папку и подменяет справочник товаров."""
+    (tmp_path / "data").mkdir()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(
+        utils, "get_products_details",
+        lambda ids: {pid: PRODUCTS[pid] for pid in ids if pid in PRODUCTS}
+    )
+    return tmp_path / "data" / "learned_products.csv"
+
+
+@pytest.fixture
+def io_calls(monkeypatch) -> dict:
+    """Считает чтения и записи CSV."""
+    calls = {"read": 0, "write": 0}
+    read_csv, to_csv = pd.read_csv, pd.DataFrame.to_csv
+
+    def counting_read(*args, **kwargs):
+        calls["read"] += 1
+        return read_csv(*args, **kwargs)
+
+    def counting_write(self, *args, **kwargs):
+        calls["write"] += 1
+        return to_csv(self, *args, **kwargs)
+
+    monkeypatch.setattr(utils.pd, "read_csv", counting_read)
+    monkeypatch.setattr(pd.DataFrame, "to_csv", counting_write)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_first_write_creates_file_with_header(csv_path: pathlib.Path):
+    """Проверяет создание файла с заголовком при первом сохранении."""
+    assert await utils.save_product_match("p1", "малина", 0.8)
+
+    saved = pd.read_csv(csv_path)
+    assert list(saved.columns) == [
+        "original_name", "product_id", "product_name", "confidence", "is_verified"
+    ]
+    assert saved.to_dict("records") == [{
+        "original_name": "малина",
+        "product_id": "p1",
+        "product_name": "Raspberry",
+        "confidence": 0.8,
+        "is_verified": True,
+    }]
+
+
+@pytest.mark.asyncio
+async def test_batch_uses_one_read_and_one_write(csv_path: pathlib.Path, io_calls: dict):
+    """Проверяет, что пакет сохраняется за одно чтение и одну запись файла."""
+    pd.DataFrame([{
+        "original_name": "яблоко",
+        "product_id": "p1",
+        "product_name": "Raspberry",
+        "confidence": 0.5,
+        "is_verified": True,
+    }]).to_csv(csv_path, index=False)
+    io_calls["write"] = 0
+
+    assert await utils.save_product_matches([
+        {"product_id": "p1", "original_name": "малина", "confidence": 0.9},
+        {"product_id": "p2", "original_name": "яблоко", "confidence": 0.95},
+    ])
+
+    assert io_calls == {"read": 1, "write": 1}
+    saved = pd.read_csv(csv_path).set_index("original_name")
+    assert sorted(saved.index) == ["малина", "яблоко"]
+    assert saved.loc["яблоко", "product_id"] == "p2"
+
+
+@pytest.mark.asyncio
+async def test_duplicate_names_keep_last_match(csv_path: pathlib.Path):
+    """Проверяет, что при повторе названия в пакете сохраняется последнее сопоставление."""
+    assert await utils.save_product_matches([
+        {"product_id": "p1", "original_name": "малина", "confidence": 0.6},
+        {"product_id": "p2", "original_name": "малина", "confidence": 0.7},
+    ])
+
+    saved = pd.read_csv(csv_path)
+    assert saved[["original_name", "product_id"]].values.tolist() == [["малина", "p2"]]
+
+
+@pytest.mark.asyncio
+async def test_unknown_product_saves_nothing(csv_path: pathlib.Path):
+    """Проверяет, что пакет с неизвестным товаром не сохраняется."""
+    assert not await utils.save_product_matches([
+        {"product_id": "p1", "original_name": "малина", "confidence": 0.9},
+        {"product_id": "missing", "original_name": "груша", "confidence": 0.9},
+    ])
+    assert not csv_path.exists()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("incomplete", [
+    {"product_id": "p2", "original_name": "", "confidence": 0.9},
+    {"product_id": None, "original_name": "груша", "confidence": 0.9},
+])
+async def test_incomplete_match_rejected_before_csv(
+    csv_path: pathlib.Path, io_calls: dict, monkeypatch, incomplete: dict
+):
+    """Проверяет, что неполное сопоставление отклоняется до обращения к справочнику и CSV."""
+    lookups = []
+    monkeypatch.setattr(utils, "get_products_details", lambda ids: lookups.append(ids) or {})
+
+    assert not await utils.save_product_matches([
+        {"product_id": "p1", "original_name": "малина", "confidence": 0.9},
+        incomplete,
+    ])
+    assert not lookups
+    assert io_calls == {"read": 0, "write": 0}
+    assert not csv_path.exists()
@@ -9,6 +9,8 @@ from app.utils.message_formatter import (
     get_status_emoji,
     format_position,
     build_message,
+    build_message_parts,
+    split_message,
     _MD_V2_SPECIAL
 )
 from tests.data.sample_invoices import TEST_INVOICES, TEST_ISSUES
@@ -146,4 +148,31 @@ def test_message_length_limit():
     """Тест ограничения длины сообщения."""
     message = build_message(TEST_INVOICES["long_values"], [])
     assert len(message) <= 4096
-    assert message.endswith("...") 
\ No newline at end of file
+    assert message.endswith("...") 
+
+def test_split_message():
+    """Тест разбиения длинного сообщения по абзацам."""
+    assert split_message("short") == ["short"]
+    
+    paragraphs = [f"{i}\\. " + "x" * 40 for i in range(10)]
+    message = "\n\n".join(paragraphs)
+    parts = split_message(message, limit=100)
+    
+    assert all(len(part) <= 100 for part in parts)
+    assert "\n\n".join(parts) == message
+
+def test_build_message_parts_keeps_all_positions():
+    """Тест, что части сообщения содержат все позиции без обрезки."""
+    invoice = {
+        "supplier": "Поставщик",
+        "date": "2024-03-15",
+        "positions": [
+            {"name": f"Товар {i} " + "y" * 80, "quantity": 1, "unit": "шт", "price": 1, "sum": 1}
+            for i in range(1, 61)
+        ]
+    }
+    parts = build_message_parts(invoice, [])
+    
+    assert len(parts) > 1
+    assert all(len(part) <= 4096 for part in parts)
+    assert "60\\. ✅ Товар 60" in parts[-1]